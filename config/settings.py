@@ -6,35 +6,111 @@ Loads values from environment variables with sensible defaults.
 """
 
 import os
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import List, Optional
-from pydantic_settings import BaseSettings
-from pydantic import Field
+from types import MappingProxyType
+from typing import ClassVar, Dict, FrozenSet, List, Mapping, Optional, Tuple
+import numpy as np
+from pydantic_settings import BaseSettings, EnvSettingsSource, SettingsConfigDict
+from pydantic import AliasChoices, Field
 from dotenv import load_dotenv
 
 # Load .env file from project root
 PROJECT_ROOT = Path(__file__).parent.parent
 ENV_FILE = PROJECT_ROOT / ".env"
-if ENV_FILE.exists():
-    load_dotenv(ENV_FILE)
-else:
-    # Try config directory
-    load_dotenv(PROJECT_ROOT / "config" / ".env")
 
+# Survives importlib.reload() so the .env is only parsed once per process
+_DOTENV_LOADED = globals().get("_DOTENV_LOADED", False)
 
-class DatabaseSettings(BaseSettings):
+if not _DOTENV_LOADED:
+    # Project root first, then config directory
+    for _env_path in (ENV_FILE, PROJECT_ROOT / "config" / ".env"):
+        if _env_path.is_file():
+            load_dotenv(_env_path, override=False)
+            break
+    _DOTENV_LOADED = True
+
+
+# Environment read once and shared by every settings model below, instead
+# of each model walking os.environ. Keys are lowercased to match
+# pydantic-settings' default case-insensitive lookup.
+_ENV_SNAPSHOT: Dict[str, str] = {}
+
+
+def _snapshot_environ():
+    """(Re)capture os.environ for the settings models."""
+    global _ENV_SNAPSHOT
+    _ENV_SNAPSHOT = {k.lower(): v for k, v in os.environ.items()}
+
+
+_snapshot_environ()
+
+
+class _SnapshotEnvSource(EnvSettingsSource):
+    """Env settings source backed by the module-level snapshot."""
+    
+    def _load_env_vars(self):
+        return _ENV_SNAPSHOT
+
+
+class _ProjectSettings(BaseSettings):
+    """Base for all settings groups; reads env from the shared snapshot."""
+    
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls,
+        init_settings,
+        env_settings,
+        dotenv_settings,
+        file_secret_settings,
+    ):
+        return (
+            init_settings,
+            _SnapshotEnvSource(settings_cls),
+            dotenv_settings,
+            file_secret_settings,
+        )
+
+
+class DatabaseSettings(_ProjectSettings):
     """Supabase database configuration."""
     supabase_url: str = Field(default="", env="SUPABASE_URL")
     supabase_key: str = Field(default="", env="SUPABASE_KEY")
+    # Field names differ from the env vars, so they're read via an alias
+    max_connections: int = Field(
+        default=50,
+        validation_alias=AliasChoices("SUPABASE_MAX_CONNECTIONS", "max_connections")
+    )
+    max_keepalive_connections: int = Field(
+        default=20,
+        validation_alias=AliasChoices(
+            "SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "max_keepalive_connections"
+        )
+    )
+    allow_raw_sql: bool = Field(default=False, env="ALLOW_RAW_SQL")
+    max_workers: int = Field(
+        default=16,
+        validation_alias=AliasChoices("SUPABASE_MAX_WORKERS", "max_workers")
+    )
+    # Direct Postgres URL (Supabase "connection string"); enables COPY ingest
+    db_url: str = Field(
+        default="",
+        validation_alias=AliasChoices("SUPABASE_DB_URL", "db_url")
+    )
     
     @property
     def is_configured(self) -> bool:
         return bool(self.supabase_url and self.supabase_key)
 
 
-class APISettings(BaseSettings):
+class APISettings(_ProjectSettings):
     """API keys for external services."""
     gemini_api_key: str = Field(default="", env="GEMINI_API_KEY")
+    gemini_api_keys: str = Field(default="", env="GEMINI_API_KEYS")
     fred_api_key: str = Field(default="", env="FRED_API_KEY")
     bls_api_key: str = Field(default="", env="BLS_API_KEY")
     socrata_app_token: str = Field(default="", env="SOCRATA_APP_TOKEN")
@@ -42,9 +118,17 @@ class APISettings(BaseSettings):
         default="PropensityEngine contact@example.com",
         env="SEC_USER_AGENT"
     )
+    
+    @cached_property
+    def gemini_keys_list(self) -> Tuple[str, ...]:
+        """GEMINI_API_KEYS (comma-separated) or else the single GEMINI_API_KEY."""
+        keys = tuple(k.strip() for k in self.gemini_api_keys.split(",") if k.strip())
+        if keys:
+            return keys
+        return (self.gemini_api_key,) if self.gemini_api_key else ()
 
 
-class GeographySettings(BaseSettings):
+class GeographySettings(_ProjectSettings):
     """Target geography configuration."""
     target_cities: str = Field(
         default="Dallas,Fort Worth,Arlington,Irving,Plano",
@@ -53,24 +137,44 @@ class GeographySettings(BaseSettings):
     target_state: str = Field(default="TX", env="TARGET_STATE")
     target_zips: str = Field(default="75001,75006,75019", env="TARGET_ZIPS")
     
-    @property
-    def cities_list(self) -> List[str]:
-        return [c.strip() for c in self.target_cities.split(",")]
+    # Parsed once per instance; tuples so callers can't mutate the cache
+    @cached_property
+    def cities_list(self) -> Tuple[str, ...]:
+        return tuple(c.strip() for c in self.target_cities.split(","))
     
-    @property
-    def zips_list(self) -> List[str]:
-        return [z.strip() for z in self.target_zips.split(",")]
+    @cached_property
+    def zips_list(self) -> Tuple[str, ...]:
+        return tuple(z.strip() for z in self.target_zips.split(","))
 
 
-class PipelineSettings(BaseSettings):
+class PipelineSettings(_ProjectSettings):
     """Pipeline-specific configuration."""
     min_permit_value: int = Field(default=50000, env="MIN_PERMIT_VALUE")
     permit_lookback_days: int = Field(default=30, env="PERMIT_LOOKBACK_DAYS")
+    # Re-fetch this many days before the newest stored permit (late filings)
+    permit_overlap_days: int = Field(default=2, env="PERMIT_OVERLAP_DAYS")
+    socrata_cache_enabled: bool = Field(default=True, env="SOCRATA_CACHE_ENABLED")
+    socrata_cache_ttl_hours: float = Field(default=6.0, env="SOCRATA_CACHE_TTL_HOURS")
+    # Expired responses are kept this long for stale-on-error, then pruned
+    socrata_cache_max_age_days: float = Field(default=7.0, env="SOCRATA_CACHE_MAX_AGE_DAYS")
+    glassdoor_cache_enabled: bool = Field(default=True, env="GLASSDOOR_CACHE_ENABLED")
+    glassdoor_cache_ttl_days: float = Field(default=7.0, env="GLASSDOOR_CACHE_TTL_DAYS")
+    # Companies not found are retried after this long
+    glassdoor_miss_ttl_hours: float = Field(default=1.0, env="GLASSDOOR_MISS_TTL_HOURS")
     hot_lead_threshold: int = Field(default=75, env="HOT_LEAD_THRESHOLD")
 
 
-class ScoringWeights(BaseSettings):
+class ScoringWeights(_ProjectSettings):
     """Propensity score calculation weights."""
+    # Read once at startup; frozen so the cached vector can't go stale
+    model_config = SettingsConfigDict(frozen=True)
+    
+    # Order of the components in as_vector()
+    FIELDS: ClassVar[Tuple[str, ...]] = (
+        "expansion", "distress", "job_velocity",
+        "sentiment", "market_tightness", "macro",
+    )
+    
     expansion: float = Field(default=0.25, env="WEIGHT_EXPANSION")
     distress: float = Field(default=0.20, env="WEIGHT_DISTRESS")
     job_velocity: float = Field(default=0.20, env="WEIGHT_JOB_VELOCITY")
@@ -78,16 +182,26 @@ class ScoringWeights(BaseSettings):
     market_tightness: float = Field(default=0.10, env="WEIGHT_MARKET_TIGHTNESS")
     macro: float = Field(default=0.10, env="WEIGHT_MACRO")
     
+    @cached_property
+    def _vector(self) -> np.ndarray:
+        vector = np.array([getattr(self, f) for f in self.FIELDS], dtype=np.float64)
+        vector.setflags(write=False)
+        return vector
+    
+    def as_vector(self) -> np.ndarray:
+        """Weights as a read-only array, ordered like FIELDS."""
+        return self._vector
+    
+    @cached_property
+    def _weights_valid(self) -> bool:
+        return abs(self._vector.sum() - 1.0) < 0.001
+    
     def validate_weights(self) -> bool:
         """Ensure weights sum to 1.0."""
-        total = (
-            self.expansion + self.distress + self.job_velocity +
-            self.sentiment + self.market_tightness + self.macro
-        )
-        return abs(total - 1.0) < 0.001
+        return self._weights_valid
 
 
-class AISettings(BaseSettings):
+class AISettings(_ProjectSettings):
     """AI model configuration."""
     gemini_flash_model: str = Field(
         default="gemini-3-flash-preview",
@@ -101,6 +215,35 @@ class AISettings(BaseSettings):
         default="claude-sonnet-4-20250514",
         env="CLAUDE_MODEL"
     )
+    gemini_concurrency: int = Field(default=5, env="GEMINI_CONCURRENCY")
+    gemini_rpm: int = Field(default=60, env="GEMINI_RPM")
+    gemini_tpm: int = Field(default=250_000, env="GEMINI_TPM")
+    gemini_batch_size: int = Field(default=5, env="GEMINI_BATCH_SIZE")
+    gemini_cache_enabled: bool = Field(default=True, env="GEMINI_CACHE_ENABLED")
+    gemini_cache_ttl_days: int = Field(default=7, env="GEMINI_CACHE_TTL_DAYS")
+
+
+class _LazySection:
+    """
+    Descriptor that builds a settings group on first access and keeps it
+    in the owner's ``_<name>`` slot.
+    """
+    
+    def __init__(self, factory):
+        self.factory = factory
+    
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            value = self.factory()
+            setattr(obj, self.slot, value)
+            return value
 
 
 class Settings:
@@ -120,23 +263,52 @@ class Settings:
         w = settings.weights.expansion
     """
     
+    # Sub-settings are built on first access so importing the singleton
+    # doesn't pay for groups a caller never touches.
+    _SECTIONS = ("database", "api", "geography", "pipeline", "weights", "ai")
+    
+    __slots__ = ("project_root", "_status") + tuple(f"_{name}" for name in _SECTIONS)
+    
+    database = _LazySection(DatabaseSettings)
+    api = _LazySection(APISettings)
+    geography = _LazySection(GeographySettings)
+    pipeline = _LazySection(PipelineSettings)
+    weights = _LazySection(ScoringWeights)
+    ai = _LazySection(AISettings)
+    
     def __init__(self):
-        self.database = DatabaseSettings()
-        self.api = APISettings()
-        self.geography = GeographySettings()
-        self.pipeline = PipelineSettings()
-        self.weights = ScoringWeights()
-        self.ai = AISettings()
         self.project_root = PROJECT_ROOT
     
+    def reset(self):
+        """Drop cached sub-settings so the next access re-reads the environment."""
+        _snapshot_environ()
+        for name in ("status",) + self._SECTIONS:
+            try:
+                delattr(self, f"_{name}")
+            except AttributeError:
+                pass
+    
+    @property
+    def status(self) -> dict:
+        """Validation results, computed once until reset()."""
+        try:
+            return self._status
+        except AttributeError:
+            self._status = self._compute_status()
+            return self._status
+    
     def validate(self) -> dict:
         """
         Validate all settings and return status.
         Returns dict with validation results.
         """
+        return dict(self.status)
+    
+    def _compute_status(self) -> dict:
+        """Build the validation results dict."""
         results = {
             "database_configured": self.database.is_configured,
-            "gemini_configured": bool(self.api.gemini_api_key),
+            "gemini_configured": bool(self.api.gemini_keys_list),
             "fred_configured": bool(self.api.fred_api_key),
             "weights_valid": self.weights.validate_weights(),
             "target_cities": len(self.geography.cities_list),
@@ -153,29 +325,33 @@ class Settings:
         """Print configuration status to console."""
         validation = self.validate()
         
-        print("\n" + "="*50)
-        print("⚙️  PROPENSITY ENGINE CONFIGURATION STATUS")
-        print("="*50)
+        # Build the whole report and write it in one call
+        lines = []
+        lines.append("\n" + "="*50)
+        lines.append("⚙️  PROPENSITY ENGINE CONFIGURATION STATUS")
+        lines.append("="*50)
         
-        print("\n📡 API Keys:")
-        print(f"  • Supabase: {'✅ Configured' if validation['database_configured'] else '❌ Missing'}")
-        print(f"  • Gemini:   {'✅ Configured' if validation['gemini_configured'] else '❌ Missing'}")
-        print(f"  • FRED:     {'✅ Configured' if validation['fred_configured'] else '⚠️  Optional'}")
+        lines.append("\n📡 API Keys:")
+        lines.append(f"  • Supabase: {'✅ Configured' if validation['database_configured'] else '❌ Missing'}")
+        lines.append(f"  • Gemini:   {'✅ Configured' if validation['gemini_configured'] else '❌ Missing'}")
+        lines.append(f"  • FRED:     {'✅ Configured' if validation['fred_configured'] else '⚠️  Optional'}")
         
-        print("\n🎯 Geography:")
-        print(f"  • State: {self.geography.target_state}")
-        print(f"  • Cities: {validation['target_cities']} configured")
-        print(f"  • Zip codes: {validation['target_zips']} configured")
+        lines.append("\n🎯 Geography:")
+        lines.append(f"  • State: {self.geography.target_state}")
+        lines.append(f"  • Cities: {validation['target_cities']} configured")
+        lines.append(f"  • Zip codes: {validation['target_zips']} configured")
         
-        print("\n⚖️  Scoring Weights:")
-        print(f"  • Valid: {'✅ Yes' if validation['weights_valid'] else '❌ No (must sum to 1.0)'}")
+        lines.append("\n⚖️  Scoring Weights:")
+        lines.append(f"  • Valid: {'✅ Yes' if validation['weights_valid'] else '❌ No (must sum to 1.0)'}")
         
-        print("\n" + "="*50)
+        lines.append("\n" + "="*50)
         if validation["all_valid"]:
-            print("✅ All critical settings configured! Ready to run.")
+            lines.append("✅ All critical settings configured! Ready to run.")
         else:
-            print("❌ Some settings are missing. Check your .env file.")
-        print("="*50 + "\n")
+            lines.append("❌ Some settings are missing. Check your .env file.")
+        lines.append("="*50 + "\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return validation
 
@@ -189,34 +365,61 @@ settings = Settings()
 # ===========================================
 # These are the open data portals for major cities
 
-SOCRATA_ENDPOINTS = {
-    "Dallas": {
-        "domain": "www.dallasopendata.com",
-        "dataset_id": "e7gq-4sah",
-        "date_field": "permit_issue_date",
-        "description_field": "work_description",
-        "value_field": "estimated_cost",
-        "address_field": "site_address"
-    },
-    "Fort Worth": {
-        "domain": "data.fortworthtexas.gov",
-        "dataset_id": "x4m5-e4hn",
-        "date_field": "issue_date",
-        "description_field": "description",
-        "value_field": "valuation",
-        "address_field": "address"
-    },
+@dataclass(frozen=True, slots=True)
+class SocrataEndpoint:
+    """Field mapping for one city's Socrata permit dataset."""
+    domain: str
+    dataset_id: str
+    date_field: str
+    description_field: str
+    value_field: str
+    address_field: str
+    permit_id_field: str                     # The city's own permit number
+    contractor_field: Optional[str] = None   # None = dataset doesn't publish one
+    extra_fields: Tuple[str, ...] = ()       # Any other raw columns to fetch
+    cache_ttl_hours: Optional[float] = None  # None = settings.pipeline default
+    url: str = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(
+            self, "url", f"https://{self.domain}/resource/{self.dataset_id}.json"
+        )
+
+
+SOCRATA_ENDPOINTS: Mapping[str, SocrataEndpoint] = MappingProxyType({
+    "Dallas": SocrataEndpoint(
+        domain="www.dallasopendata.com",
+        dataset_id="e7gq-4sah",
+        date_field="permit_issue_date",
+        description_field="work_description",
+        value_field="estimated_cost",
+        address_field="site_address",
+        permit_id_field="permit_number",
+        contractor_field="contractor"
+    ),
+    "Fort Worth": SocrataEndpoint(
+        domain="data.fortworthtexas.gov",
+        dataset_id="x4m5-e4hn",
+        date_field="issue_date",
+        description_field="description",
+        value_field="valuation",
+        address_field="address",
+        permit_id_field="permit_no",
+        contractor_field="contractor_name"
+    ),
     # Houston (nearby market, good for expansion)
-    "Houston": {
-        "domain": "data.houstontx.gov",
-        "dataset_id": "9bts-bhwh",
-        "date_field": "permit_issue_date",
-        "description_field": "permit_description",
-        "value_field": "project_value",
-        "address_field": "site_address"
-    },
+    "Houston": SocrataEndpoint(
+        domain="data.houstontx.gov",
+        dataset_id="9bts-bhwh",
+        date_field="permit_issue_date",
+        description_field="permit_description",
+        value_field="project_value",
+        address_field="site_address",
+        permit_id_field="permit_number",
+        contractor_field="contractor_name"
+    ),
     # Add more cities as you expand
-}
+})
 
 
 # ===========================================
@@ -224,7 +427,7 @@ SOCRATA_ENDPOINTS = {
 # ===========================================
 # These keywords in permit descriptions indicate industrial expansion
 
-INDUSTRIAL_KEYWORDS = [
+INDUSTRIAL_KEYWORDS: Tuple[str, ...] = (
     "warehouse",
     "distribution",
     "logistics",
@@ -247,7 +450,50 @@ INDUSTRIAL_KEYWORDS = [
     "industrial",
     "3pl",
     "third party logistics",
-]
+)
+
+def _trie_pattern(words) -> str:
+    """
+    Regex for a set of literal words with shared prefixes factored out.
+    
+    ("rack", "racking") becomes "rack(?:ing)?": at any position the first
+    character picks a single branch, so the engine walks the keyword trie
+    once (Aho-Corasick style) instead of retrying every alternative.
+    Longer keywords win over their prefixes. Spaces are left unescaped
+    so the pattern is also valid RE2 (used by the Arrow filter path).
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a keyword
+    
+    def build(node: Dict) -> str:
+        branches = [
+            (char if char.isalnum() or char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword ends here; longer ones continue (greedy, so they win)
+            return "(?:" + body + ")?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+    
+    return build(trie)
+
+
+# Compiled once at import; a single pass over a description finds every keyword
+INDUSTRIAL_PATTERN = re.compile(_trie_pattern(INDUSTRIAL_KEYWORDS), re.IGNORECASE)
+
+
+def match_industrial(description: str) -> List[str]:
+    """Return the industrial keywords found in a permit description."""
+    if not description:
+        return []
+    return [m.group(0).lower() for m in INDUSTRIAL_PATTERN.finditer(description)]
 
 
 # ===========================================
@@ -255,19 +501,19 @@ INDUSTRIAL_KEYWORDS = [
 # ===========================================
 # States we scrape WARN notices from
 
-WARN_STATES = ["TX", "CA", "IL", "NY", "FL", "GA", "OH", "PA"]
+WARN_STATES: FrozenSet[str] = frozenset(("TX", "CA", "IL", "NY", "FL", "GA", "OH", "PA"))
 
 
 # ===========================================
 # FRED SERIES (Economic Indicators)
 # ===========================================
 
-FRED_SERIES = {
+FRED_SERIES: Mapping[str, str] = MappingProxyType({
     "freight_shipments": "FRGSHPUSM649NCIS",  # Cass Freight Index
     "manufacturing_inventory": "MNFCTRMPCIMSA",
     "trucking_employment": "CES4348400001",
     "warehouse_employment": "CES4349300001",
-}
+})
 
 
 if __name__ == "__main__":
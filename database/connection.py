@@ -1,18 +1,39 @@
 """
 💾 DATABASE CONNECTION MODULE
 ==============================
-Handles all Supabase interactions with retry logic and error handling.
+Handles all Supabase interactions with retry logic, a circuit breaker
+and error handling.
 """
 
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime, date
+import csv
+import io
 import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 from supabase import create_client, Client
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+)
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # Optional - supabase-py falls back to stdlib json
+    orjson = None
+
+try:
+    import psycopg2
+except ImportError:  # Optional - bulk ingest falls back to REST upserts
+    psycopg2 = None
+
 # Import settings
 import sys
 from pathlib import Path
@@ -20,6 +41,109 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import settings
 
 
+# Conflict targets for the project-specific upserts (built once, not per call)
+PERMIT_CONFLICT = "source_city,permit_id"
+PERMIT_COLUMNS = (
+    "source_city", "source_dataset", "permit_id", "issue_date",
+    "work_description", "reported_cost", "address", "contractor_name",
+    "expansion_score", "is_industrial"
+)
+WARN_CONFLICT = "source_state,company_name,notice_date"
+WARN_COLUMNS = (
+    "source_state", "company_name", "notice_date", "effective_date",
+    "affected_count", "layoff_type", "city", "zip_code", "is_industrial"
+)
+JOB_CONFLICT = "job_url"
+JOB_COLUMNS = (
+    "company_name", "job_title", "city", "state", "source_board",
+    "job_url", "posted_date", "is_industrial"
+)
+INDICATOR_CONFLICT = "series_id,record_date"
+SIGNAL_CONFLICT = "company_id,record_date"
+
+# Company rows remembered between clear_company_cache() calls (LRU-bounded
+# so a long-lived process doesn't grow without limit)
+COMPANY_CACHE_SIZE = 10_000
+
+# PostgREST's default max-rows; a shorter page is the last one
+SIGNAL_PAGE_SIZE = 1000
+
+# Error codes meaning an RPC isn't in the schema (PostgREST "function not
+# found", Postgres undefined_function, plain HTTP 404)
+MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883", "404", 404})
+
+# Company name normalization: stacked suffixes ("Smith Co Inc") are all
+# stripped, as the original suffix loop did
+_COMPANY_SUFFIX_RE = re.compile(
+    r"(?: (?:llc|inc|corp|corporation|co|company|ltd|limited|lp|llp|pllc|pc))+$"
+)
+_PUNCTUATION_TABLE = str.maketrans("", "", ",.'")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker is open and calls are short-circuited."""
+
+
+class CircuitBreaker:
+    """
+    Minimal thread-safe circuit breaker.
+    
+    After ``fail_max`` consecutive failures the circuit opens and every
+    call fails fast with CircuitOpenError until ``reset_timeout`` seconds
+    have passed; the next call is then let through as a trial.
+    """
+    
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            return time.monotonic() - self._opened_at < self.reset_timeout
+    
+    def call(self, func, *args, **kwargs):
+        """Run ``func`` through the breaker, recording success or failure."""
+        if self.is_open:
+            raise CircuitOpenError("Supabase circuit open - skipping request")
+        
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+                if self._failures >= self.fail_max:
+                    self._opened_at = time.monotonic()
+            raise
+        
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+        return result
+
+
+# Retry only idempotent operations (upserts and reads); an open circuit
+# is not worth waiting on.
+retry_idempotent = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_not_exception_type(CircuitOpenError)
+)
+
+
+def _is_missing_function(exc: BaseException) -> bool:
+    """True if exc says the called RPC doesn't exist (older schema)."""
+    return (
+        getattr(exc, "code", None) in MISSING_FUNCTION_CODES
+        or "PGRST202" in str(exc)
+    )
+
+
 class DatabaseConnection:
     """
     Singleton class for Supabase database operations.
@@ -39,10 +163,20 @@ class DatabaseConnection:
     
     _instance: Optional['DatabaseConnection'] = None
     _client: Optional[Client] = None
+    _lock = threading.Lock()
+    _breaker = CircuitBreaker(fail_max=5, reset_timeout=30)
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    # (normalized_name, zip_code) -> company_master row
+                    instance._company_cache = OrderedDict()
+                    instance._company_cache_lock = threading.Lock()
+                    # Cleared if the schema lacks get_latest_signals
+                    instance._latest_signals_rpc = True
+                    cls._instance = instance
         return cls._instance
     
     def __init__(self):
@@ -59,12 +193,65 @@ class DatabaseConnection:
             logger.info("Set SUPABASE_URL and SUPABASE_KEY in your .env file")
             return
         
+        with self._lock:
+            if self._client is not None:
+                return
+            
+            try:
+                self._client = create_client(url, key, **self._client_options())
+                self._install_orjson_encoder()
+                logger.info("✅ Connected to Supabase successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to connect to Supabase: {e}")
+                raise
+    
+    @staticmethod
+    def _client_options() -> Dict[str, Any]:
+        """
+        Build create_client kwargs with a sized httpx connection pool.
+        
+        Older supabase-py releases don't accept a custom httpx client;
+        those fall back to the library's default pool.
+        """
         try:
-            self._client = create_client(url, key)
-            logger.info("✅ Connected to Supabase successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to connect to Supabase: {e}")
-            raise
+            from supabase import ClientOptions
+            
+            http_client = httpx.Client(limits=httpx.Limits(
+                max_connections=settings.database.max_connections,
+                max_keepalive_connections=settings.database.max_keepalive_connections
+            ))
+            return {"options": ClientOptions(httpx_client=http_client)}
+        except (ImportError, TypeError):
+            logger.debug("supabase-py has no httpx_client option, using default pool")
+            return {}
+    
+    def _install_orjson_encoder(self):
+        """
+        Encode PostgREST request bodies with orjson when it is installed.
+        
+        supabase-py hands ``json=`` to httpx, which encodes with stdlib
+        json. Pre-encoding here moves that work into C for large batches.
+        """
+        if orjson is None:
+            return
+        
+        session = getattr(self._client.postgrest, "session", None)
+        if session is None:
+            return
+        
+        build_request = session.build_request
+        
+        def build_request_orjson(method, url, *, json=None, content=None, headers=None, **kwargs):
+            if json is not None and content is None:
+                content = orjson.dumps(json, option=orjson.OPT_SERIALIZE_NUMPY)
+                headers = {**(headers or {}), "Content-Type": "application/json"}
+                json = None
+            return build_request(
+                method, url, json=json, content=content, headers=headers, **kwargs
+            )
+        
+        session.build_request = build_request_orjson
+        logger.debug("Using orjson for Supabase request bodies")
     
     @property
     def client(self) -> Client:
@@ -73,10 +260,6 @@ class DatabaseConnection:
             self._initialize_client()
         return self._client
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     def insert(
         self, 
         table: str, 
@@ -96,7 +279,9 @@ class DatabaseConnection:
             # Convert dates to strings for JSON serialization
             clean_data = self._serialize_data(data)
             
-            response = self.client.table(table).insert(clean_data).execute()
+            response = self._breaker.call(
+                lambda: self.client.table(table).insert(clean_data).execute()
+            )
             
             if response.data:
                 logger.debug(f"Inserted record into {table}")
@@ -107,21 +292,24 @@ class DatabaseConnection:
             logger.error(f"Insert error in {table}: {e}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     def insert_many(
         self, 
         table: str, 
-        records: List[Dict[str, Any]]
+        records: List[Dict[str, Any]],
+        batch_size: int = 500,
+        max_workers: int = 1
     ) -> List[Dict]:
         """
-        Insert multiple records at once (batch insert).
+        Insert multiple records, split into batches of ``batch_size``.
+        
+        Each batch is its own request, so no single payload grows
+        unbounded. Inserts are not retried since they aren't idempotent.
         
         Args:
             table: Table name
             records: List of dictionaries
+            batch_size: Maximum records per request
+            max_workers: Batches to send concurrently (shares the pool)
             
         Returns:
             List of inserted records
@@ -129,26 +317,46 @@ class DatabaseConnection:
         if not records:
             return []
         
+        batches = [
+            records[start:start + batch_size]
+            for start in range(0, len(records), batch_size)
+        ]
+        
+        inserted = []
+        if max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+                for rows in pool.map(lambda batch: self._insert_batch(table, batch), batches):
+                    inserted.extend(rows)
+        else:
+            for batch in batches:
+                inserted.extend(self._insert_batch(table, batch))
+        
+        logger.info(f"Inserted {len(inserted)} records into {table}")
+        return inserted
+    
+    def _insert_batch(
+        self,
+        table: str,
+        records: List[Dict[str, Any]]
+    ) -> List[Dict]:
+        """Insert one batch of records in a single request."""
         try:
             clean_records = [self._serialize_data(r) for r in records]
-            response = self.client.table(table).insert(clean_records).execute()
-            
-            logger.info(f"Inserted {len(response.data)} records into {table}")
-            return response.data
+            response = self._breaker.call(
+                lambda: self.client.table(table).insert(clean_records).execute()
+            )
+            return response.data or []
             
         except Exception as e:
             logger.error(f"Batch insert error in {table}: {e}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    @retry_idempotent
     def upsert(
         self, 
         table: str, 
         data: Dict[str, Any],
-        conflict_columns: List[str]
+        conflict_columns: Union[str, List[str]]
     ) -> Optional[Dict]:
         """
         Insert or update a record based on conflict columns.
@@ -156,7 +364,8 @@ class DatabaseConnection:
         Args:
             table: Table name
             data: Dictionary of column:value pairs
-            conflict_columns: Columns that determine uniqueness
+            conflict_columns: Columns that determine uniqueness, as a list
+                or a prebuilt comma-separated string
             
         Returns:
             The upserted record
@@ -164,10 +373,13 @@ class DatabaseConnection:
         try:
             clean_data = self._serialize_data(data)
             
-            response = (
-                self.client
+            if not isinstance(conflict_columns, str):
+                conflict_columns = ",".join(conflict_columns)
+            
+            response = self._breaker.call(
+                lambda: self.client
                 .table(table)
-                .upsert(clean_data, on_conflict=",".join(conflict_columns))
+                .upsert(clean_data, on_conflict=conflict_columns)
                 .execute()
             )
             
@@ -180,10 +392,168 @@ class DatabaseConnection:
             logger.error(f"Upsert error in {table}: {e}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    def upsert_many(
+        self,
+        table: str,
+        records: List[Dict[str, Any]],
+        conflict_columns: Union[str, List[str]],
+        batch_size: int = 500,
+        max_workers: int = 1
+    ) -> List[Dict]:
+        """
+        Upsert multiple records, one request per ``batch_size`` rows.
+        
+        Args:
+            table: Table name
+            records: List of dictionaries
+            conflict_columns: Columns that determine uniqueness
+            batch_size: Maximum records per request
+            max_workers: Batches to send concurrently (shares the pool)
+            
+        Returns:
+            List of upserted records
+        """
+        if not records:
+            return []
+        
+        if not isinstance(conflict_columns, str):
+            conflict_columns = ",".join(conflict_columns)
+        
+        batches = [
+            records[start:start + batch_size]
+            for start in range(0, len(records), batch_size)
+        ]
+        
+        upserted = []
+        if max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+                for rows in pool.map(
+                    lambda batch: self._upsert_batch(table, batch, conflict_columns),
+                    batches
+                ):
+                    upserted.extend(rows)
+        else:
+            for batch in batches:
+                upserted.extend(self._upsert_batch(table, batch, conflict_columns))
+        
+        logger.info(f"Upserted {len(upserted)} records into {table}")
+        return upserted
+    
+    @retry_idempotent
+    def _upsert_batch(
+        self,
+        table: str,
+        records: List[Dict[str, Any]],
+        conflict_columns: str
+    ) -> List[Dict]:
+        """Upsert one batch of records in a single request."""
+        try:
+            clean_records = [self._serialize_data(r) for r in records]
+            response = self._breaker.call(
+                lambda: self.client
+                .table(table)
+                .upsert(clean_records, on_conflict=conflict_columns)
+                .execute()
+            )
+            return response.data or []
+            
+        except Exception as e:
+            logger.error(f"Batch upsert error in {table}: {e}")
+            raise
+    
+    @property
+    def copy_enabled(self) -> bool:
+        """True when a direct Postgres connection is available for COPY."""
+        return bool(psycopg2 is not None and settings.database.db_url)
+    
+    @retry_idempotent
+    def copy_upsert(
+        self,
+        table: str,
+        records: List[Dict[str, Any]],
+        columns: Sequence[str],
+        conflict_columns: Union[str, List[str]]
+    ) -> int:
+        """
+        Upsert records by streaming them through COPY.
+        
+        COPY skips per-row statement parsing and planning, so it is the
+        fastest way into Postgres. Rows go into a temp table first and are
+        merged with INSERT ... ON CONFLICT DO UPDATE, matching upsert().
+        
+        Args:
+            table: Table name
+            records: List of dictionaries
+            columns: Columns to load (keys missing from a record are NULL)
+            conflict_columns: Columns that determine uniqueness
+            
+        Returns:
+            Number of rows inserted or updated
+        """
+        if not records:
+            return 0
+        
+        if not isinstance(conflict_columns, str):
+            conflict_columns = ",".join(conflict_columns)
+        
+        # CSV in memory; None is written as \N so "" stays an empty string
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow([
+                self._copy_value(record.get(column)) for column in columns
+            ])
+        
+        column_list = ", ".join(columns)
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in columns
+            if column not in conflict_columns.split(",")
+        )
+        
+        def load() -> int:
+            conn = psycopg2.connect(settings.database.db_url)
+            try:
+                with conn, conn.cursor() as cur:
+                    cur.execute(
+                        f"CREATE TEMP TABLE _copy_{table} "
+                        f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    cur.copy_expert(
+                        f"COPY _copy_{table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                        buffer
+                    )
+                    cur.execute(
+                        f"INSERT INTO {table} ({column_list}) "
+                        f"SELECT {column_list} FROM _copy_{table} "
+                        f"ON CONFLICT ({conflict_columns}) DO UPDATE SET {updates}"
+                    )
+                    return cur.rowcount
+            finally:
+                conn.close()
+        
+        try:
+            buffer.seek(0)
+            count = self._breaker.call(load)
+            logger.info(f"Copied {count} records into {table}")
+            return count
+            
+        except Exception as e:
+            logger.error(f"COPY error in {table}: {e}")
+            raise
+    
+    @staticmethod
+    def _copy_value(value: Any) -> Any:
+        """Format one value for a COPY CSV field."""
+        if value is None:
+            return "\\N"
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+    
+    @retry_idempotent
     def query(
         self,
         table: str,
@@ -191,7 +561,11 @@ class DatabaseConnection:
         filters: Optional[Dict[str, Any]] = None,
         order_by: Optional[str] = None,
         limit: Optional[int] = None,
-        offset: int = 0
+        offset: int = 0,
+        eq_filters: Optional[Dict[str, Any]] = None,
+        in_filters: Optional[Dict[str, List[Any]]] = None,
+        like_filters: Optional[Dict[str, str]] = None,
+        gte_filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict]:
         """
         Query records from a table.
@@ -200,30 +574,58 @@ class DatabaseConnection:
             table: Table name
             columns: Comma-separated column names or "*" for all
             filters: Dictionary of column:value pairs for WHERE clause
-            order_by: Column name to sort by (prefix with - for DESC)
+                (list values become IN filters)
+            order_by: Column name(s) to sort by, comma-separated (prefix
+                each with - for DESC)
             limit: Maximum records to return
             offset: Number of records to skip
+            eq_filters: column:value equality filters, already split
+            in_filters: column:values IN filters, already split
+            like_filters: column:pattern LIKE filters (% wildcard), e.g.
+                {"zip_code": "752%"} for a prefix match
+            gte_filters: column:minimum filters (column >= value)
             
         Returns:
             List of matching records
         """
+        # Don't bother building the request while the circuit is open
+        if self._breaker.is_open:
+            raise CircuitOpenError("Supabase circuit open - skipping request")
+        
         try:
             query = self.client.table(table).select(columns)
             
-            # Apply filters
+            # Legacy mixed filters are split once; hot callers pass them pre-split
             if filters:
+                eq_filters = dict(eq_filters or {})
+                in_filters = dict(in_filters or {})
                 for col, val in filters.items():
                     if isinstance(val, list):
-                        query = query.in_(col, val)
+                        in_filters[col] = val
                     else:
-                        query = query.eq(col, val)
+                        eq_filters[col] = val
+            
+            # Apply filters
+            if eq_filters:
+                for col, val in eq_filters.items():
+                    query = query.eq(col, val)
+            if in_filters:
+                for col, vals in in_filters.items():
+                    query = query.in_(col, vals)
+            if like_filters:
+                for col, pattern in like_filters.items():
+                    query = query.like(col, pattern)
+            if gte_filters:
+                for col, val in gte_filters.items():
+                    query = query.gte(col, val)
             
             # Apply ordering
             if order_by:
-                if order_by.startswith("-"):
-                    query = query.order(order_by[1:], desc=True)
-                else:
-                    query = query.order(order_by)
+                for col in order_by.split(","):
+                    if col.startswith("-"):
+                        query = query.order(col[1:], desc=True)
+                    else:
+                        query = query.order(col)
             
             # Apply pagination
             if limit:
@@ -231,7 +633,7 @@ class DatabaseConnection:
             if offset:
                 query = query.offset(offset)
             
-            response = query.execute()
+            response = self._breaker.call(query.execute)
             return response.data
             
         except Exception as e:
@@ -240,13 +642,9 @@ class DatabaseConnection:
     
     def get_by_id(self, table: str, id: str) -> Optional[Dict]:
         """Get a single record by UUID."""
-        results = self.query(table, filters={"id": id}, limit=1)
+        results = self.query(table, eq_filters={"id": id}, limit=1)
         return results[0] if results else None
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     def update(
         self,
         table: str,
@@ -267,8 +665,8 @@ class DatabaseConnection:
         try:
             clean_data = self._serialize_data(data)
             
-            response = (
-                self.client
+            response = self._breaker.call(
+                lambda: self.client
                 .table(table)
                 .update(clean_data)
                 .eq("id", id)
@@ -284,14 +682,12 @@ class DatabaseConnection:
             logger.error(f"Update error in {table}: {e}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     def delete(self, table: str, id: str) -> bool:
         """Delete a record by ID."""
         try:
-            self.client.table(table).delete().eq("id", id).execute()
+            self._breaker.call(
+                lambda: self.client.table(table).delete().eq("id", id).execute()
+            )
             logger.debug(f"Deleted record {id} from {table}")
             return True
         except Exception as e:
@@ -302,9 +698,17 @@ class DatabaseConnection:
         """
         Execute raw SQL (use with caution).
         Requires Supabase Pro plan for full SQL access.
+        
+        Development only - disabled unless ALLOW_RAW_SQL is set. Repeated
+        lookups should go through a named database function instead.
         """
+        if not settings.database.allow_raw_sql:
+            raise PermissionError("execute_sql is disabled (set ALLOW_RAW_SQL=true)")
+        
         try:
-            response = self.client.rpc("execute_sql", {"query": sql}).execute()
+            response = self._breaker.call(
+                lambda: self.client.rpc("execute_sql", {"query": sql}).execute()
+            )
             return response.data
         except Exception as e:
             logger.error(f"SQL execution error: {e}")
@@ -313,15 +717,17 @@ class DatabaseConnection:
     @staticmethod
     def _serialize_data(data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert Python objects to JSON-serializable types."""
-        result = {}
-        for key, value in data.items():
+        # Fast path: most records are already plain JSON values
+        for value in data.values():
             if isinstance(value, (datetime, date)):
-                result[key] = value.isoformat()
-            elif value is None:
-                result[key] = None
-            else:
-                result[key] = value
-        return result
+                break
+        else:
+            return data
+        
+        return {
+            key: value.isoformat() if isinstance(value, (datetime, date)) else value
+            for key, value in data.items()
+        }
     
     # ===================================
     # CONVENIENCE METHODS FOR THIS PROJECT
@@ -347,24 +753,118 @@ class DatabaseConnection:
         # Normalize the name for matching
         normalized = self._normalize_company_name(company_name)
         
+        # Same company is usually seen many times per run
+        cache_key = (normalized, zip_code)
+        cached = self._cached_company(cache_key)
+        if cached is not None:
+            return cached
+        
         # Try to find existing
         existing = self.query(
             "company_master",
-            filters={"normalized_name": normalized, "zip_code": zip_code},
+            eq_filters={"normalized_name": normalized, "zip_code": zip_code},
             limit=1
         )
         
         if existing:
-            return existing[0]
-        
-        # Create new
-        data = {
-            "company_name": company_name,
-            "normalized_name": normalized,
-            "zip_code": zip_code,
-            **extra_fields
-        }
-        return self.insert("company_master", data)
+            company = existing[0]
+        else:
+            # Create new
+            data = {
+                "company_name": company_name,
+                "normalized_name": normalized,
+                "zip_code": zip_code,
+                **extra_fields
+            }
+            company = self.insert("company_master", data)
+        
+        if company:
+            self._remember_company(cache_key, company)
+        return company
+    
+    def get_or_create_companies(
+        self,
+        records: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> List[Optional[Dict]]:
+        """
+        Bulk version of get_or_create_company.
+        
+        Looks up all uncached companies with one IN query per zip code and
+        creates the missing ones with a single insert_many.
+        
+        Args:
+            records: (company_name, zip_code, extra_fields) tuples
+            
+        Returns:
+            Company records in the same order as the input
+        """
+        keys = [
+            (self._normalize_company_name(name), zip_code)
+            for name, zip_code, _ in records
+        ]
+        
+        found: Dict[Tuple[str, str], Dict] = {}
+        
+        # Group uncached names by zip code
+        pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for key, (name, _, extra) in zip(keys, records):
+            if key in found:
+                continue
+            cached = self._cached_company(key)
+            if cached is not None:
+                found[key] = cached
+                continue
+            normalized, zip_code = key
+            pending.setdefault(zip_code, {}).setdefault(normalized, {
+                "company_name": name,
+                "normalized_name": normalized,
+                "zip_code": zip_code,
+                **(extra or {})
+            })
+        
+        to_insert = []
+        for zip_code, by_name in pending.items():
+            existing = self.query(
+                "company_master",
+                eq_filters={"zip_code": zip_code},
+                in_filters={"normalized_name": list(by_name)}
+            )
+            for row in existing:
+                found[(row["normalized_name"], zip_code)] = row
+            to_insert.extend(
+                data for normalized, data in by_name.items()
+                if (normalized, zip_code) not in found
+            )
+        
+        for row in self.insert_many("company_master", to_insert):
+            found[(row["normalized_name"], row["zip_code"])] = row
+        
+        for key, row in found.items():
+            self._remember_company(key, row)
+        
+        return [found.get(key) for key in keys]
+    
+    def _cached_company(self, key: Tuple[str, str]) -> Optional[Dict]:
+        """A copy of a cached company row (callers may mutate it), or None."""
+        with self._company_cache_lock:
+            row = self._company_cache.get(key)
+            if row is None:
+                return None
+            self._company_cache.move_to_end(key)
+        return dict(row)
+    
+    def _remember_company(self, key: Tuple[str, str], row: Dict):
+        """Cache a copy of a company row, evicting the least recently used."""
+        with self._company_cache_lock:
+            self._company_cache[key] = dict(row)
+            self._company_cache.move_to_end(key)
+            while len(self._company_cache) > COMPANY_CACHE_SIZE:
+                self._company_cache.popitem(last=False)
+    
+    def clear_company_cache(self):
+        """Forget cached company lookups (called around each pipeline run)."""
+        with self._company_cache_lock:
+            self._company_cache.clear()
     
     @staticmethod
     def _normalize_company_name(name: str) -> str:
@@ -372,20 +872,9 @@ class DatabaseConnection:
         if not name:
             return ""
         
-        # Lowercase
-        normalized = name.lower().strip()
-        
-        # Remove common suffixes
-        suffixes = [
-            " llc", " inc", " corp", " corporation", " co", " company",
-            " ltd", " limited", " lp", " llp", " pllc", " pc"
-        ]
-        for suffix in suffixes:
-            if normalized.endswith(suffix):
-                normalized = normalized[:-len(suffix)]
-        
-        # Remove punctuation
-        normalized = normalized.replace(",", "").replace(".", "").replace("'", "")
+        # Lowercase, drop trailing legal suffixes, then remove punctuation
+        normalized = _COMPANY_SUFFIX_RE.sub("", name.lower().strip())
+        normalized = normalized.translate(_PUNCTUATION_TABLE)
         
         return normalized.strip()
     
@@ -394,15 +883,182 @@ class DatabaseConnection:
         return self.upsert(
             "raw_permits",
             permit_data,
-            conflict_columns=["source_city", "permit_id"]
+            conflict_columns=PERMIT_CONFLICT
         )
     
+    def save_permits_bulk(self, permits: List[Dict]) -> int:
+        """
+        Save many raw permit records.
+        
+        With SUPABASE_DB_URL set (and psycopg2 installed) the rows are
+        streamed with COPY; otherwise one REST upsert per 500 rows.
+        
+        Rows repeating a (source_city, permit_id) are collapsed to the
+        last one, since Postgres rejects an upsert that touches the same
+        row twice.
+        
+        Returns:
+            Number of rows saved
+        """
+        unique = list({(p.get("source_city"), p.get("permit_id")): p for p in permits}.values())
+        
+        if self.copy_enabled:
+            return self.copy_upsert(
+                "raw_permits",
+                unique,
+                columns=PERMIT_COLUMNS,
+                conflict_columns=PERMIT_CONFLICT
+            )
+        
+        return len(self.upsert_many(
+            "raw_permits",
+            unique,
+            conflict_columns=PERMIT_CONFLICT
+        ))
+    
+    def get_existing_permit_ids(
+        self,
+        source_city: str,
+        permit_ids: List[str],
+        chunk_size: int = 200,
+        max_workers: Optional[int] = None
+    ) -> set:
+        """
+        Which of these permit IDs are already stored for a city.
+        
+        Same chunked, parallel IN-filter pattern as get_latest_signals_bulk.
+        
+        Args:
+            source_city: City the permits came from
+            permit_ids: Candidate permit IDs
+            chunk_size: IDs per request
+            max_workers: Parallel requests (default SUPABASE_MAX_WORKERS)
+            
+        Returns:
+            Set of permit IDs that already have a raw_permits row
+        """
+        if not permit_ids:
+            return set()
+        
+        permit_ids = list(permit_ids)
+        chunks = [
+            permit_ids[start:start + chunk_size]
+            for start in range(0, len(permit_ids), chunk_size)
+        ]
+        
+        def fetch(chunk: List[str]) -> List[Dict]:
+            return self.query(
+                "raw_permits",
+                columns="permit_id",
+                eq_filters={"source_city": source_city},
+                in_filters={"permit_id": chunk}
+            )
+        
+        workers = min(max_workers or settings.database.max_workers, len(chunks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fetch, chunks))
+        else:
+            results = [fetch(chunk) for chunk in chunks]
+        
+        return {row["permit_id"] for rows in results for row in rows}
+    
+    @retry_idempotent
+    def get_last_permit_date(self, source_city: str) -> Optional[date]:
+        """
+        Newest issue_date stored for a city (the ingest high-water mark).
+        
+        Returns:
+            The date, or None if the city has no dated permits yet
+        """
+        try:
+            response = self._breaker.call(
+                lambda: self.client
+                .table("raw_permits")
+                .select("issue_date")
+                .eq("source_city", source_city)
+                .not_.is_("issue_date", "null")
+                .order("issue_date", desc=True)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Error fetching last permit date for {source_city}: {e}")
+            raise
+        
+        if not response.data:
+            return None
+        return date.fromisoformat(str(response.data[0]["issue_date"])[:10])
+    
     def save_warn_notice(self, warn_data: Dict) -> Optional[Dict]:
         """Save a raw WARN notice."""
         return self.upsert(
             "raw_warn_notices",
             warn_data,
-            conflict_columns=["source_state", "company_name", "notice_date"]
+            conflict_columns=WARN_CONFLICT
+        )
+    
+    def save_warn_notices_bulk(self, notices: List[Dict]) -> int:
+        """
+        Save many raw WARN notices (COPY when available, else batched REST).
+        
+        Rows repeating a (source_state, company_name, notice_date) are
+        collapsed to the last one, as in save_permits_bulk.
+        
+        Returns:
+            Number of rows saved
+        """
+        unique = list({
+            (n.get("source_state"), n.get("company_name"), n.get("notice_date")): n
+            for n in notices
+        }.values())
+        
+        if self.copy_enabled:
+            return self.copy_upsert(
+                "raw_warn_notices",
+                unique,
+                columns=WARN_COLUMNS,
+                conflict_columns=WARN_CONFLICT
+            )
+        
+        return len(self.upsert_many(
+            "raw_warn_notices",
+            unique,
+            conflict_columns=WARN_CONFLICT
+        ))
+    
+    def save_job_postings_bulk(self, jobs: List[Dict]) -> int:
+        """
+        Save many raw job postings (COPY when available, else batched REST).
+        
+        Rows repeating a job_url are collapsed to the last one, as in
+        save_permits_bulk.
+        
+        Returns:
+            Number of rows saved
+        """
+        unique = list({j.get("job_url"): j for j in jobs}.values())
+        
+        if self.copy_enabled:
+            return self.copy_upsert(
+                "raw_job_postings",
+                unique,
+                columns=JOB_COLUMNS,
+                conflict_columns=JOB_CONFLICT
+            )
+        
+        return len(self.upsert_many(
+            "raw_job_postings",
+            unique,
+            conflict_columns=JOB_CONFLICT
+        ))
+    
+    def save_indicators_bulk(self, indicators: List[Dict]) -> List[Dict]:
+        """Save economic indicator observations in one upsert."""
+        return self.upsert_many(
+            "economic_indicators",
+            indicators,
+            conflict_columns=INDICATOR_CONFLICT
         )
     
     def save_signal_history(self, company_id: str, signals: Dict) -> Optional[Dict]:
@@ -411,16 +1067,176 @@ class DatabaseConnection:
         return self.upsert(
             "signal_history",
             data,
-            conflict_columns=["company_id", "record_date"]
+            conflict_columns=SIGNAL_CONFLICT
         )
     
-    def get_hot_leads(self, min_score: int = 75, limit: int = 100) -> List[Dict]:
-        """Get companies with high propensity scores."""
-        return self.query(
-            "hot_leads",
-            order_by="-propensity_score",
-            limit=limit
+    @retry_idempotent
+    def get_latest_signals_bulk(
+        self,
+        company_ids: List[str],
+        chunk_size: int = 200,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Latest signal_history row for each company.
+        
+        IDs go out in chunks (keeps requests short), and the chunks are
+        fetched in parallel threads - each is a blocking HTTP round trip,
+        so they overlap while waiting on the network.
+        
+        Each chunk asks the get_latest_signals RPC for one row per company.
+        Only if the function doesn't exist (older schema) is the chunk's
+        full history paged through instead, since PostgREST caps every
+        response at its max-rows; other errors are retried.
+        
+        Args:
+            company_ids: Company UUIDs to look up
+            chunk_size: IDs per request
+            max_workers: Parallel requests (default SUPABASE_MAX_WORKERS)
+            
+        Returns:
+            Dict of company_id -> latest signal row (missing if none)
+        """
+        if not company_ids:
+            return {}
+        
+        company_ids = list(company_ids)
+        chunks = [
+            company_ids[start:start + chunk_size]
+            for start in range(0, len(company_ids), chunk_size)
+        ]
+        
+        def fetch(chunk: List[str]) -> List[Dict]:
+            if self._latest_signals_rpc:
+                try:
+                    return self._breaker.call(
+                        lambda: self.client.rpc(
+                            "get_latest_signals", {"company_ids": chunk}
+                        ).execute()
+                    ).data
+                except Exception as e:
+                    if not _is_missing_function(e):
+                        raise
+                    # Schema predates the function - page the raw history
+                    logger.debug(f"get_latest_signals RPC unavailable: {e}")
+                    self._latest_signals_rpc = False
+            
+            rows = []
+            while True:
+                page = self.query(
+                    "signal_history",
+                    in_filters={"company_id": chunk},
+                    order_by="-record_date,company_id",
+                    limit=SIGNAL_PAGE_SIZE,
+                    offset=len(rows)
+                )
+                rows.extend(page)
+                if len(page) < SIGNAL_PAGE_SIZE:
+                    return rows
+        
+        workers = min(max_workers or settings.database.max_workers, len(chunks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fetch, chunks))
+        else:
+            results = [fetch(chunk) for chunk in chunks]
+        
+        # Rows arrive newest first - keep the first seen per company
+        latest = {}
+        for rows in results:
+            for row in rows:
+                latest.setdefault(row["company_id"], row)
+        return latest
+    
+    @retry_idempotent
+    def get_companies_with_latest_signals(
+        self,
+        limit: int = 100,
+        company_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Companies joined to their latest signal_history row.
+        
+        One RPC round trip instead of a company query plus a signal
+        query per company.
+        
+        Args:
+            limit: Maximum companies to return
+            company_id: Restrict to a single company
+            
+        Returns:
+            List of company rows with the latest *_score columns and
+            macro_modifier merged in (None where no signals yet)
+        """
+        try:
+            response = self._breaker.call(
+                lambda: self.client.rpc(
+                    "get_companies_with_latest_signals",
+                    {"max_rows": limit, "target_company": company_id}
+                ).execute()
+            )
+            return response.data
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            # Schema predates the function - do the join client-side
+            logger.debug(f"get_companies_with_latest_signals RPC unavailable: {e}")
+        
+        if company_id:
+            companies = self.query("company_master", eq_filters={"id": company_id}, limit=1)
+        else:
+            companies = self.query("company_master", limit=limit)
+        
+        latest = self.get_latest_signals_bulk([c["id"] for c in companies])
+        
+        # Company columns win over signal columns (both have id/created_at)
+        return [{**latest.get(c["id"], {}), **c} for c in companies]
+    
+    def save_signal_history_bulk(
+        self,
+        rows: List[Dict],
+        max_workers: int = 1
+    ) -> List[Dict]:
+        """
+        Save many signal history snapshots in one upsert per 500 rows.
+        
+        Args:
+            rows: Snapshots, each including its company_id
+            max_workers: Batches to send concurrently
+        """
+        return self.upsert_many(
+            "signal_history",
+            rows,
+            conflict_columns=SIGNAL_CONFLICT,
+            max_workers=max_workers
         )
+    
+    @retry_idempotent
+    def get_hot_leads(self, min_score: int = 75, limit: int = 100) -> List[Dict]:
+        """
+        Get companies with high propensity scores.
+        
+        Uses the get_hot_leads RPC; if the schema predates it, the hot_leads
+        view filtered by min_score (the view itself only holds 75+ scores).
+        """
+        try:
+            response = self._breaker.call(
+                lambda: self.client.rpc(
+                    "get_hot_leads",
+                    {"min_score": min_score, "max_rows": limit}
+                ).execute()
+            )
+            return response.data
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            logger.debug(f"get_hot_leads RPC unavailable, using view: {e}")
+            return self.query(
+                "hot_leads",
+                gte_filters={"propensity_score": min_score},
+                order_by="-propensity_score",
+                limit=limit
+            )
 
 
 # Singleton instance - use this in other modules
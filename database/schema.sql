@@ -136,6 +136,9 @@ CREATE TABLE IF NOT EXISTS raw_permits (
     address TEXT,
     contractor_name VARCHAR(255),
     
+    -- Log-scaled permit value score (0-100), computed at ingest
+    expansion_score DECIMAL,
+    
     -- Processing status
     matched_company_id UUID REFERENCES company_master(id),
     is_industrial BOOLEAN DEFAULT FALSE,
@@ -147,6 +150,7 @@ CREATE TABLE IF NOT EXISTS raw_permits (
 );
 
 CREATE INDEX IF NOT EXISTS idx_permits_date ON raw_permits(issue_date);
+CREATE INDEX IF NOT EXISTS idx_permits_city_date ON raw_permits(source_city, issue_date DESC);
 CREATE INDEX IF NOT EXISTS idx_permits_industrial ON raw_permits(is_industrial) WHERE is_industrial = TRUE;
 
 
@@ -184,6 +188,8 @@ CREATE TABLE IF NOT EXISTS raw_warn_notices (
 
 CREATE INDEX IF NOT EXISTS idx_warn_date ON raw_warn_notices(notice_date);
 CREATE INDEX IF NOT EXISTS idx_warn_zip ON raw_warn_notices(zip_code);
+-- Lets LIKE '752%' prefix searches use an index regardless of collation
+CREATE INDEX IF NOT EXISTS idx_warn_zip_prefix ON raw_warn_notices(zip_code varchar_pattern_ops);
 
 
 -- ===========================================
@@ -220,6 +226,8 @@ CREATE TABLE IF NOT EXISTS raw_job_postings (
 CREATE INDEX IF NOT EXISTS idx_jobs_company ON raw_job_postings(company_name);
 CREATE INDEX IF NOT EXISTS idx_jobs_date ON raw_job_postings(posted_date);
 CREATE INDEX IF NOT EXISTS idx_jobs_zip ON raw_job_postings(zip_code);
+-- Upsert target for Pipeline 5 (ON CONFLICT needs a unique index)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_url ON raw_job_postings(job_url);
 
 
 -- ===========================================
@@ -297,6 +305,93 @@ WHERE sh.propensity_score >= 75
   )
 ORDER BY sh.propensity_score DESC;
 
+-- Parameterized version of the view, called by name over RPC so the
+-- client sends bind values instead of SQL text
+CREATE OR REPLACE FUNCTION get_hot_leads(
+    min_score INTEGER DEFAULT 75,
+    max_rows INTEGER DEFAULT 100
+)
+RETURNS SETOF hot_leads AS $$
+    SELECT 
+        cm.id,
+        cm.company_name,
+        cm.city,
+        cm.state,
+        cm.zip_code,
+        cm.website_url,
+        sh.propensity_score,
+        sh.score_tier,
+        sh.permit_value,
+        sh.permit_description,
+        sh.job_post_count_30d,
+        sh.glassdoor_rating,
+        sh.local_unemployment_rate,
+        sh.record_date
+    FROM company_master cm
+    JOIN signal_history sh ON cm.id = sh.company_id
+    WHERE sh.propensity_score >= min_score
+      AND sh.record_date = (
+          SELECT MAX(record_date) 
+          FROM signal_history 
+          WHERE company_id = cm.id
+      )
+    ORDER BY sh.propensity_score DESC
+    LIMIT max_rows;
+$$ LANGUAGE sql STABLE;
+
+-- Every company joined to its latest signal_history row, so scoring
+-- needs one round trip instead of two per company
+CREATE OR REPLACE FUNCTION get_companies_with_latest_signals(
+    max_rows INTEGER DEFAULT 100,
+    target_company UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    company_name VARCHAR(255),
+    city VARCHAR(100),
+    state VARCHAR(2),
+    record_date DATE,
+    expansion_score DECIMAL,
+    distress_score DECIMAL,
+    sentiment_score DECIMAL,
+    job_velocity_score DECIMAL,
+    turnover_score DECIMAL,
+    market_tightness_score DECIMAL,
+    macro_modifier DECIMAL
+) AS $$
+    SELECT 
+        cm.id,
+        cm.company_name,
+        cm.city,
+        cm.state,
+        sh.record_date,
+        sh.expansion_score,
+        sh.distress_score,
+        sh.sentiment_score,
+        sh.job_velocity_score,
+        sh.turnover_score,
+        sh.market_tightness_score,
+        sh.macro_modifier
+    FROM company_master cm
+    LEFT JOIN (
+        SELECT DISTINCT ON (company_id) *
+        FROM signal_history
+        ORDER BY company_id, record_date DESC
+    ) sh ON sh.company_id = cm.id
+    WHERE target_company IS NULL OR cm.id = target_company
+    LIMIT max_rows;
+$$ LANGUAGE sql STABLE;
+
+-- Latest signal_history row for each of the given companies - one row
+-- per company, so PostgREST's max-rows cap can't cut anyone off
+CREATE OR REPLACE FUNCTION get_latest_signals(company_ids UUID[])
+RETURNS SETOF signal_history AS $$
+    SELECT DISTINCT ON (company_id) *
+    FROM signal_history
+    WHERE company_id = ANY(company_ids)
+    ORDER BY company_id, record_date DESC;
+$$ LANGUAGE sql STABLE;
+
 
 -- ===========================================
 -- 🔄 UPDATE TRIGGER
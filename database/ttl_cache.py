@@ -0,0 +1,177 @@
+"""
+💾 LOCAL TTL CACHE
+==================
+Shared base for the on-disk response caches (Gemini, Socrata, Glassdoor).
+
+Each cache is one SQLite file of key -> JSON value rows with a creation
+time and an expiry. Expired rows are pruned on open and on every write,
+so the files don't grow without bound between manual clears.
+
+SQLite (stdlib) rather than Redis: the engine runs as scheduled scripts
+on one machine with no Redis service to deploy, and a file under
+~/.cache already survives restarts and is shared by every process there.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+CACHE_DIR = Path.home() / ".cache" / "propensity"
+
+
+class TTLCache:
+    """
+    Key/value cache with per-entry expiry, backed by one SQLite file.
+    
+    Subclasses set DEFAULT_PATH (and LEGACY_TABLE, the table their older
+    single-purpose schema used, which is dropped on open).
+    
+    Usage:
+        class MyCache(TTLCache):
+            DEFAULT_PATH = CACHE_DIR / "my.sqlite"
+        
+        cache = MyCache(ttl_seconds=3600)
+        key = MyCache.make_key("dataset", query)
+        
+        value = cache.get(key)
+        if value is None:
+            value = fetch(...)
+            cache.set(key, value)
+    """
+    
+    DEFAULT_PATH: Path = CACHE_DIR / "cache.sqlite"
+    LEGACY_TABLE: Optional[str] = None
+    
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: float = 7 * 86400):
+        self.path = Path(path or self.DEFAULT_PATH)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        if self.LEGACY_TABLE:
+            self._conn.execute(f"DROP TABLE IF EXISTS {self.LEGACY_TABLE}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ttl_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                tag TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.prune()
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Cache key for a tuple of strings (e.g. model + prompt)."""
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+    
+    def _lookup(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[Tuple]:
+        """
+        The (value,) row for an unexpired key, else None.
+        
+        Args:
+            key: Cache key
+            max_age_seconds: Also treat entries created longer ago as missing
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, expires_at FROM ttl_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        value, created_at, expires_at = row
+        now = time.time()
+        if expires_at < now:
+            return None
+        if max_age_seconds is not None and now - created_at >= max_age_seconds:
+            return None
+        return (value,)
+    
+    def get(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        row = self._lookup(key, max_age_seconds)
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+    
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        tag: Optional[str] = None
+    ):
+        """Store a JSON-serializable value (default expiry: ttl_seconds)."""
+        self._store(key, json.dumps(value), ttl_seconds, tag)
+    
+    def _store(
+        self,
+        key: str,
+        value: Optional[str],
+        ttl_seconds: Optional[float] = None,
+        tag: Optional[str] = None
+    ):
+        """Write one entry, then prune expired ones."""
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ttl_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, tag, now, now + ttl)
+            )
+            self._conn.execute("DELETE FROM ttl_cache WHERE expires_at < ?", (now,))
+            self._conn.commit()
+    
+    def delete(self, key: str):
+        """Remove one entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM ttl_cache WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def prune(self) -> int:
+        """Remove expired entries. Returns the number removed."""
+        with self._lock:
+            count = self._conn.execute(
+                "DELETE FROM ttl_cache WHERE expires_at < ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        return count
+    
+    def clear(self) -> int:
+        """Remove all entries. Returns the number removed."""
+        with self._lock:
+            count = self._conn.execute("DELETE FROM ttl_cache").rowcount
+            self._conn.commit()
+        return count
+    
+    def list_entries(self) -> List[Dict]:
+        """Summaries of all cached entries, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, tag, created_at, expires_at FROM ttl_cache "
+                "ORDER BY created_at DESC"
+            ).fetchall()
+        
+        now = time.time()
+        return [
+            {
+                "key": key,
+                "tag": tag,
+                "created_at": created_at,
+                "expired": expires_at < now,
+            }
+            for key, tag, created_at, expires_at in rows
+        ]
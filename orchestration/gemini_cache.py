@@ -0,0 +1,44 @@
+"""
+💾 GEMINI RESPONSE CACHE
+========================
+Persistent on-disk cache for generated outreach, keyed by model + prompt.
+
+The same company and signals tend to come back run after run; a cache hit
+returns the stored email instead of paying for another Gemini call.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from database.ttl_cache import CACHE_DIR, TTLCache
+
+
+DEFAULT_CACHE_PATH = CACHE_DIR / "gemini.sqlite"
+
+
+class GeminiCache(TTLCache):
+    """
+    Key/value cache of Gemini outputs with per-entry expiry.
+    
+    Usage:
+        cache = GeminiCache()
+        key = GeminiCache.make_key("gemini-3-flash-preview", prompt)
+        
+        email = cache.get(key)
+        if email is None:
+            email = generate(...)
+            cache.set(key, email, model_name="gemini-3-flash-preview")
+    """
+    
+    DEFAULT_PATH = DEFAULT_CACHE_PATH
+    LEGACY_TABLE = "gemini_cache"
+    
+    def set(self, key: str, value: Any, model_name: Optional[str] = None):
+        """Store a JSON-serializable value, tagged with its model."""
+        super().set(key, value, tag=model_name)
+    
+    def list_entries(self) -> List[Dict]:
+        """Summaries of all cached entries (with their model), newest first."""
+        entries = super().list_entries()
+        for entry in entries:
+            entry["model"] = entry.pop("tag")
+        return entries
@@ -14,22 +14,190 @@ MODELS:
 - Gemini 3 Pro: Complex personalization, executive outreach
 """
 
+import asyncio
+import itertools
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import importlib.util
 import json
 import re
-import smtplib
-import dns.resolver
-from email.utils import parseaddr
+import threading
+import time
 
 from loguru import logger
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # Optional - stdlib json is just slower
+    _json_loads = json.loads
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import settings
 from database.connection import db
+from orchestration.gemini_cache import GeminiCache
+
+
+class GeminiRateLimiter:
+    """
+    Token buckets for Gemini requests-per-minute and tokens-per-minute.
+    
+    Both buckets refill continuously; a call waits until it can take one
+    request and its estimated prompt tokens. A limit of 0 or less turns
+    that bucket off (unlimited). Safe to share across threads and
+    coroutines.
+    """
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity if available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            limit_requests = self.rpm > 0
+            limit_tokens = self.tpm > 0
+            
+            if limit_requests:
+                self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+            if limit_tokens:
+                self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+                tokens = min(tokens, self.tpm)
+            
+            has_request = not limit_requests or self._requests >= 1
+            has_tokens = not limit_tokens or self._tokens >= tokens
+            if has_request and has_tokens:
+                if limit_requests:
+                    self._requests -= 1
+                if limit_tokens:
+                    self._tokens -= tokens
+                return 0.0
+            
+            wait_requests = (1 - self._requests) * 60 / self.rpm if limit_requests else 0.0
+            wait_tokens = (tokens - self._tokens) * 60 / self.tpm if limit_tokens else 0.0
+            return max(wait_requests, wait_tokens, 0.0)
+    
+    def acquire(self, tokens: int = 0):
+        """Block until a request with ``tokens`` prompt tokens may be sent."""
+        while (delay := self._reserve(tokens)) > 0:
+            time.sleep(delay)
+    
+    async def acquire_async(self, tokens: int = 0):
+        """Async version of acquire()."""
+        while (delay := self._reserve(tokens)) > 0:
+            await asyncio.sleep(delay)
+
+
+def _cancel_stream(response):
+    """
+    Stop a streaming Gemini response that won't be read to the end.
+    
+    The response wraps the underlying gRPC/HTTP stream as _iterator;
+    cancelling (or closing) it stops the download instead of letting
+    the rest of the generation keep arriving.
+    """
+    stream = getattr(response, "_iterator", response)
+    cancel = getattr(stream, "cancel", None) or getattr(stream, "close", None)
+    if cancel is None:
+        return
+    try:
+        cancel()
+    except Exception as e:
+        logger.debug(f"Couldn't cancel Gemini stream: {e}")
+
+
+async def _cancel_stream_async(response):
+    """Async version of _cancel_stream (also closes async generators)."""
+    stream = getattr(response, "_iterator", response)
+    cancel = getattr(stream, "cancel", None)
+    aclose = getattr(stream, "aclose", None)
+    try:
+        if cancel is not None:
+            cancel()
+        elif aclose is not None:
+            await aclose()
+    except Exception as e:
+        logger.debug(f"Couldn't cancel Gemini stream: {e}")
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """True for Gemini quota errors (HTTP 429 / ResourceExhausted)."""
+    return (
+        type(exc).__name__ == "ResourceExhausted"
+        or getattr(exc, "code", None) == 429
+        or "429" in str(exc)
+    )
+
+
+# Back off only on quota errors; anything else fails straight to the template
+retry_on_rate_limit = retry(
+    retry=retry_if_exception(_is_rate_limited),
+    wait=wait_exponential(multiplier=1.5, min=1, max=60),
+    stop=stop_after_attempt(3),
+    reraise=True
+)
+
+
+# Rough output size of one generated email, used to size batched prompts
+# so a whole batch fits under Gemini's 2048-token output cap.
+EMAIL_OUTPUT_TOKENS = 300
+MAX_OUTPUT_TOKENS = 2048
+
+# JSON mode for single-lead generation: Gemini returns exactly this shape
+EMAIL_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "object",
+        "properties": {
+            "subject": {"type": "string"},
+            "body": {"type": "string"},
+        },
+        "required": ["subject", "body"],
+    },
+}
+
+# Splits a "SUBJECT: ... BODY: ..." response in one pass (streaming only)
+_SUBJECT_BODY_RE = re.compile(
+    r'SUBJECT:\s*(?P<subject>.+?)\s*BODY:\s*(?P<body>.+)',
+    re.DOTALL
+)
+
+# (signal key, threshold, angle) in priority order - first signal above
+# its threshold picks the angle, otherwise DEFAULT_ANGLE
+_ANGLE_RULES = (
+    ("expansion_score", 70, "expansion"),
+    ("distress_score", 60, "distress_nearby"),
+    ("job_velocity_score", 70, "high_turnover"),
+    ("market_tightness_score", 60, "tight_market"),
+)
+DEFAULT_ANGLE = "expansion"
+
+# Titles that get the Pro model
+_EXEC_KEYWORDS = ("VP", "DIRECTOR", "CHIEF", "PRESIDENT")
+
+# How long a key that hit its quota sits out of the rotation
+KEY_COOLDOWN_SECONDS = 60
+
+# Per-domain MX lookup cache - permute_email yields ~8 addresses per domain
+MX_CACHE_TTL = 3600
+MX_CACHE_MAX = 20_000
+
+# Failed lookups are cached too: dead domains (NXDOMAIN / no MX) for an
+# hour, timeouts only briefly since they may be transient
+MX_NEGATIVE_TTL = 3600
+MX_TIMEOUT_TTL = 30
+MX_LOOKUP_TIMEOUT = 2.0
 
 
 class SalesAgent:
@@ -81,33 +249,83 @@ class SalesAgent:
     
     def __init__(self):
         """Initialize the sales agent."""
-        self.api_key = settings.api.gemini_api_key
+        self.api_keys = settings.api.gemini_keys_list
+        self.api_key = self.api_keys[0] if self.api_keys else ""
         self.flash_model = settings.ai.gemini_flash_model
         self.pro_model = settings.ai.gemini_pro_model
         
-        self.genai = None
+        self._genai = None
+        self.ai_enabled = False
+        self._limiters: Dict[Tuple[str, str], GeminiRateLimiter] = {}
         
-        if self.api_key:
+        # Round-robin over API keys; quota-limited keys sit out a while
+        self._key_cycle = itertools.cycle(self.api_keys)
+        self._key_cooldown: Dict[str, float] = {}
+        self._key_lock = threading.Lock()
+        self._configured_key: Optional[str] = None
+        self._models: Dict[Tuple[str, str], object] = {}
+        self.cache: Optional[GeminiCache] = None
+        
+        # domain -> (has_mx, expires_at)
+        self._mx_cache: Dict[str, Tuple[bool, float]] = {}
+        self._mx_lock = threading.Lock()
+        self._resolver = None
+        self._async_resolver = None
+        
+        if settings.ai.gemini_cache_enabled:
             try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.api_key)
-                self.genai = genai
-                logger.info("✅ Gemini API initialized")
+                self.cache = GeminiCache(
+                    ttl_seconds=settings.ai.gemini_cache_ttl_days * 86400
+                )
+            except Exception as e:
+                logger.warning(f"Gemini cache unavailable: {e}")
+        
+        if self.api_key:
+            # Only check the SDK is installed; it (and grpc/protobuf) is
+            # imported on the first generation - see _lazy_genai()
+            if self._sdk_installed():
+                self.ai_enabled = True
+                logger.info(f"✅ Gemini API initialized ({len(self.api_keys)} key(s))")
                 logger.info(f"   Flash model: {self.flash_model}")
                 logger.info(f"   Pro model: {self.pro_model}")
-            except ImportError:
+            else:
                 logger.error("google-generativeai not installed")
                 logger.info("Run: pip install google-generativeai")
         else:
             logger.warning("⚠️ GEMINI_API_KEY not set - using templates only")
     
+    @staticmethod
+    def _sdk_installed() -> bool:
+        """True if google-generativeai is importable (without importing it)."""
+        try:
+            return importlib.util.find_spec("google.generativeai") is not None
+        except ModuleNotFoundError:
+            return False
+    
+    @property
+    def genai(self):
+        """The google.generativeai module, or None when AI is disabled."""
+        return self._lazy_genai() if self.ai_enabled else None
+    
+    def _lazy_genai(self):
+        """Import and configure google.generativeai on first use."""
+        if self._genai is None:
+            with self._key_lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._configured_key = self.api_key
+                    self._genai = genai
+        return self._genai
+    
     def generate_outreach(
         self,
         company_name: str,
         contact_name: Optional[str] = None,
         contact_title: Optional[str] = None,
         signals: Optional[Dict] = None,
-        style: str = "professional"
+        style: str = "professional",
+        generated_at: Optional[str] = None
     ) -> Dict:
         """
         Generate a personalized outreach email.
@@ -118,6 +336,8 @@ class SalesAgent:
             contact_title: Contact's title (optional)
             signals: Dict of propensity signals
             style: Writing style (professional, casual, executive)
+            generated_at: Timestamp to stamp on the email (default now);
+                pass one value to share it across a batch
             
         Returns:
             Dict with subject and body
@@ -128,7 +348,7 @@ class SalesAgent:
         angle = self._select_angle(signals)
         
         # Try AI generation first
-        if self.genai:
+        if self.ai_enabled:
             try:
                 return self._generate_with_ai(
                     company_name=company_name,
@@ -136,7 +356,8 @@ class SalesAgent:
                     contact_title=contact_title,
                     signals=signals,
                     angle=angle,
-                    style=style
+                    style=style,
+                    generated_at=generated_at
                 )
             except Exception as e:
                 logger.warning(f"AI generation failed: {e}")
@@ -147,23 +368,192 @@ class SalesAgent:
             company_name=company_name,
             contact_name=contact_name,
             signals=signals,
-            angle=angle
+            angle=angle,
+            generated_at=generated_at
+        )
+    
+    async def generate_outreach_async(
+        self,
+        company_name: str,
+        contact_name: Optional[str] = None,
+        contact_title: Optional[str] = None,
+        signals: Optional[Dict] = None,
+        style: str = "professional",
+        generated_at: Optional[str] = None
+    ) -> Dict:
+        """Async version of generate_outreach (same arguments and result)."""
+        signals = signals or {}
+        angle = self._select_angle(signals)
+        
+        if self.ai_enabled:
+            try:
+                return await self._generate_with_ai_async(
+                    company_name=company_name,
+                    contact_name=contact_name,
+                    contact_title=contact_title,
+                    signals=signals,
+                    angle=angle,
+                    style=style,
+                    generated_at=generated_at
+                )
+            except Exception as e:
+                logger.warning(f"AI generation failed: {e}")
+                logger.info("Falling back to template...")
+        
+        return self._generate_from_template(
+            company_name=company_name,
+            contact_name=contact_name,
+            signals=signals,
+            angle=angle,
+            generated_at=generated_at
         )
     
+    def generate_outreach_stream(
+        self,
+        company_name: str,
+        contact_name: Optional[str] = None,
+        contact_title: Optional[str] = None,
+        signals: Optional[Dict] = None,
+        style: str = "professional",
+        stop_if: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream a personalized outreach email as it is generated.
+        
+        Yields ``{"type": "chunk", "text": ...}`` events as Gemini produces
+        text, then one ``{"type": "email", ...}`` event with the parsed
+        subject/body (same fields as generate_outreach). Without Gemini
+        only the template email event is yielded.
+        
+        Args:
+            (same as generate_outreach)
+            stop_if: Called with the text so far; returning True cancels
+                generation early (no email event is emitted)
+        """
+        signals = signals or {}
+        angle = self._select_angle(signals)
+        
+        if not self.ai_enabled:
+            yield {"type": "email", **self._generate_from_template(
+                company_name=company_name,
+                contact_name=contact_name,
+                signals=signals,
+                angle=angle
+            )}
+            return
+        
+        model_name = self._select_model(contact_title)
+        prompt = self._build_prompt(
+            company_name, contact_name, contact_title, signals, angle, style
+        )
+        key = self._next_key()
+        self._limiter(model_name, key).acquire(self._estimate_tokens(prompt))
+        model = self._model(model_name, key)
+        
+        text = ""
+        try:
+            response = model.generate_content(prompt, stream=True)
+        except Exception as e:
+            self._on_key_error(key, e)
+            raise
+        
+        # Cancel the stream if we stop reading early (stop_if, or the
+        # caller closing this generator)
+        completed = False
+        try:
+            for chunk in response:
+                text += chunk.text
+                yield {"type": "chunk", "text": chunk.text}
+                if stop_if and stop_if(text):
+                    logger.info("Stopped generation early")
+                    return
+            completed = True
+        finally:
+            if not completed:
+                _cancel_stream(response)
+        
+        yield {"type": "email", **self._parse_ai_response(text, model_name, angle)}
+    
+    async def generate_outreach_stream_async(
+        self,
+        company_name: str,
+        contact_name: Optional[str] = None,
+        contact_title: Optional[str] = None,
+        signals: Optional[Dict] = None,
+        style: str = "professional",
+        stop_if: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[Dict]:
+        """Async version of generate_outreach_stream."""
+        signals = signals or {}
+        angle = self._select_angle(signals)
+        
+        if not self.ai_enabled:
+            yield {"type": "email", **self._generate_from_template(
+                company_name=company_name,
+                contact_name=contact_name,
+                signals=signals,
+                angle=angle
+            )}
+            return
+        
+        model_name = self._select_model(contact_title)
+        prompt = self._build_prompt(
+            company_name, contact_name, contact_title, signals, angle, style
+        )
+        key = self._next_key()
+        await self._limiter(model_name, key).acquire_async(self._estimate_tokens(prompt))
+        model = self._model(model_name, key)
+        
+        text = ""
+        try:
+            response = await model.generate_content_async(prompt, stream=True)
+        except Exception as e:
+            self._on_key_error(key, e)
+            raise
+        completed = False
+        try:
+            async for chunk in response:
+                text += chunk.text
+                yield {"type": "chunk", "text": chunk.text}
+                if stop_if and stop_if(text):
+                    logger.info("Stopped generation early")
+                    return
+            completed = True
+        finally:
+            if not completed:
+                await _cancel_stream_async(response)
+        
+        yield {"type": "email", **self._parse_ai_response(text, model_name, angle)}
+    
     def _select_angle(self, signals: Dict) -> str:
         """Select the best outreach angle based on signals."""
-        # Priority order
-        if signals.get("expansion_score", 0) > 70:
-            return "expansion"
-        elif signals.get("distress_score", 0) > 60:
-            return "distress_nearby"
-        elif signals.get("job_velocity_score", 0) > 70:
-            return "high_turnover"
-        elif signals.get("market_tightness_score", 0) > 60:
-            return "tight_market"
-        else:
-            return "expansion"  # Default
+        for key, threshold, angle in _ANGLE_RULES:
+            if signals.get(key, 0) > threshold:
+                return angle
+        return DEFAULT_ANGLE
+    
+    @staticmethod
+    def _select_angles_bulk(matrix):
+        """
+        Vectorized _select_angle for a batch of leads.
+        
+        Args:
+            matrix: (N, 4) array of signal scores, columns in
+                _ANGLE_RULES order
+            
+        Returns:
+            Array of N angle names
+        """
+        import numpy as np
+        
+        thresholds = np.array([rule[1] for rule in _ANGLE_RULES], dtype=np.float64)
+        angles = np.array([rule[2] for rule in _ANGLE_RULES])
+        
+        hits = np.asarray(matrix, dtype=np.float64) > thresholds
+        first_hit = hits.argmax(axis=1)
+        return np.where(hits.any(axis=1), angles[first_hit], DEFAULT_ANGLE)
     
+    @retry_on_rate_limit
     def _generate_with_ai(
         self,
         company_name: str,
@@ -171,17 +561,339 @@ class SalesAgent:
         contact_title: Optional[str],
         signals: Dict,
         angle: str,
-        style: str
+        style: str,
+        generated_at: Optional[str] = None
     ) -> Dict:
         """Generate email using Gemini."""
-        # Select model based on importance
-        if contact_title and "VP" in contact_title.upper() or "DIRECTOR" in contact_title.upper():
-            model_name = self.pro_model  # Use Pro for executives
-        else:
-            model_name = self.flash_model  # Flash for standard outreach
+        model_name = self._select_model(contact_title)
+        prompt = self._build_prompt(
+            company_name, contact_name, contact_title, signals, angle, style,
+            json_output=True
+        )
+        
+        cache_key = GeminiCache.make_key(model_name, prompt)
+        cached = self._cache_get(cache_key, generated_at)
+        if cached is not None:
+            return cached
+        
+        key = self._next_key()
+        self._limiter(model_name, key).acquire(self._estimate_tokens(prompt))
+        model = self._model(model_name, key)
+        
+        try:
+            response = model.generate_content(
+                prompt,
+                generation_config=EMAIL_GENERATION_CONFIG
+            )
+            result = self._parse_json_response(response.text, model_name, angle, generated_at)
+            self._cache_set(cache_key, result, model_name)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Gemini error: {e}")
+            self._on_key_error(key, e)
+            raise
+    
+    @retry_on_rate_limit
+    async def _generate_with_ai_async(
+        self,
+        company_name: str,
+        contact_name: Optional[str],
+        contact_title: Optional[str],
+        signals: Dict,
+        angle: str,
+        style: str,
+        generated_at: Optional[str] = None
+    ) -> Dict:
+        """Generate email using Gemini without blocking the event loop."""
+        model_name = self._select_model(contact_title)
+        prompt = self._build_prompt(
+            company_name, contact_name, contact_title, signals, angle, style,
+            json_output=True
+        )
+        
+        cache_key = GeminiCache.make_key(model_name, prompt)
+        cached = self._cache_get(cache_key, generated_at)
+        if cached is not None:
+            return cached
+        
+        key = self._next_key()
+        await self._limiter(model_name, key).acquire_async(self._estimate_tokens(prompt))
+        model = self._model(model_name, key)
+        
+        try:
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=EMAIL_GENERATION_CONFIG
+            )
+            result = self._parse_json_response(response.text, model_name, angle, generated_at)
+            self._cache_set(cache_key, result, model_name)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Gemini error: {e}")
+            self._on_key_error(key, e)
+            raise
+    
+    @retry_on_rate_limit
+    def _generate_batch_with_ai(
+        self,
+        leads: List[Dict],
+        generated_at: Optional[str] = None
+    ) -> List[Optional[Dict]]:
+        """
+        Generate emails for several hot leads in a single Gemini request.
+        
+        Returns one email per lead in input order; None where the model
+        skipped a lead or returned something unusable.
+        """
+        model_name = self.flash_model
+        prompt, angles = self._build_batch_prompt(leads)
+        
+        cache_key = GeminiCache.make_key(model_name, prompt)
+        cached = self._cache_get(cache_key, generated_at)
+        if cached is not None:
+            return cached
+        
+        key = self._next_key()
+        self._limiter(model_name, key).acquire(self._estimate_tokens(prompt))
+        model = self._model(model_name, key)
+        try:
+            response = model.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+        except Exception as e:
+            self._on_key_error(key, e)
+            raise
+        emails = self._parse_batch_response(response.text, model_name, angles, generated_at)
+        # Only complete batches: a skipped lead must be retried next run
+        if all(emails):
+            self._cache_set(cache_key, emails, model_name)
+        return emails
+    
+    @retry_on_rate_limit
+    async def _generate_batch_with_ai_async(
+        self,
+        leads: List[Dict],
+        generated_at: Optional[str] = None
+    ) -> List[Optional[Dict]]:
+        """Async version of _generate_batch_with_ai."""
+        model_name = self.flash_model
+        prompt, angles = self._build_batch_prompt(leads)
+        
+        cache_key = GeminiCache.make_key(model_name, prompt)
+        cached = self._cache_get(cache_key, generated_at)
+        if cached is not None:
+            return cached
+        
+        key = self._next_key()
+        await self._limiter(model_name, key).acquire_async(self._estimate_tokens(prompt))
+        model = self._model(model_name, key)
+        try:
+            response = await model.generate_content_async(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+        except Exception as e:
+            self._on_key_error(key, e)
+            raise
+        emails = self._parse_batch_response(response.text, model_name, angles, generated_at)
+        # Only complete batches: a skipped lead must be retried next run
+        if all(emails):
+            self._cache_set(cache_key, emails, model_name)
+        return emails
+    
+    def _build_batch_prompt(self, leads: List[Dict]) -> Tuple[str, List[str]]:
+        """Build one prompt covering several leads; also returns their angles."""
+        signals_list = [self._lead_signals(lead) for lead in leads]
+        angles = [
+            str(angle) for angle in self._select_angles_bulk([
+                [signals.get(key) or 0 for key, _, _ in _ANGLE_RULES]
+                for signals in signals_list
+            ])
+        ]
+        
+        contexts = []
+        for i, (lead, signals, angle) in enumerate(zip(leads, signals_list, angles)):
+            contexts.append({
+                "id": str(i),
+                "company": lead.get("company_name", "Company"),
+                "angle": angle,
+                "signals": {k: v for k, v in signals.items() if v},
+            })
+        
+        prompt = f"""You are a sales development representative for a light industrial staffing company.
+
+You will receive {len(leads)} lead contexts as JSON. Write one cold outreach email per lead. Each email should:
+- Be professional in tone
+- Open with a hook based on that lead's signals and angle
+- Reference specific data points when available
+- Be concise (under 150 words)
+- Include a clear call-to-action (15-minute call)
+- NOT be pushy or salesy
+
+LEADS:
+{json.dumps(contexts)}
+
+Return ONLY a JSON array with one object per lead:
+[{{"id": "<lead id>", "subject": "<subject line>", "body": "<email body>"}}]
+"""
+        return prompt, angles
+    
+    @staticmethod
+    def _parse_batch_response(
+        text: str,
+        model_name: str,
+        angles: List[str],
+        generated_at: Optional[str] = None
+    ) -> List[Optional[Dict]]:
+        """Map a batched JSON response back onto the input leads."""
+        items = _json_loads(text)
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array of emails")
         
-        model = self.genai.GenerativeModel(model_name)
+        emails: List[Optional[Dict]] = [None] * len(angles)
+        generated_at = generated_at or datetime.now().isoformat()
+        for item in items:
+            try:
+                i = int(item["id"])
+                subject, body = item["subject"], item["body"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= i < len(emails) and subject and body:
+                emails[i] = {
+                    "subject": subject.strip(),
+                    "body": body.strip(),
+                    "model": model_name,
+                    "angle": angles[i],
+                    "generated_at": generated_at
+                }
+        return emails
+    
+    def _cache_get(self, key: str, generated_at: Optional[str] = None):
+        """
+        Look up a cached Gemini result (None when disabled or missing).
         
+        Hits are re-stamped with generated_at (default now), so a batch
+        mixing cached and fresh emails shares one timestamp.
+        """
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.debug(f"Gemini cache read failed: {e}")
+            return None
+        
+        if cached is None:
+            return None
+        
+        generated_at = generated_at or datetime.now().isoformat()
+        if isinstance(cached, list):
+            return [
+                {**email, "generated_at": generated_at} if email else None
+                for email in cached
+            ]
+        return {**cached, "generated_at": generated_at}
+    
+    def _cache_set(self, key: str, value, model_name: str):
+        """Store a Gemini result if caching is enabled."""
+        if self.cache is None:
+            return
+        try:
+            self.cache.set(key, value, model_name=model_name)
+        except Exception as e:
+            logger.debug(f"Gemini cache write failed: {e}")
+    
+    def _limiter(self, model_name: str, key: str) -> GeminiRateLimiter:
+        """Rate limiter for a model + API key (quotas are per model, per key)."""
+        limiter = self._limiters.get((model_name, key))
+        if limiter is None:
+            limiter = self._limiters.setdefault(
+                (model_name, key),
+                GeminiRateLimiter(settings.ai.gemini_rpm, settings.ai.gemini_tpm)
+            )
+        return limiter
+    
+    def _next_key(self) -> str:
+        """Next API key in the rotation, skipping keys cooling down after a 429."""
+        with self._key_lock:
+            now = time.monotonic()
+            for _ in range(len(self.api_keys)):
+                key = next(self._key_cycle)
+                if self._key_cooldown.get(key, 0) <= now:
+                    return key
+            
+            # Every key is cooling down - use the one that recovers first
+            return min(self.api_keys, key=lambda k: self._key_cooldown.get(k, 0))
+    
+    def _model(self, model_name: str, key: str):
+        """
+        GenerativeModel that will call Gemini with ``key``.
+        
+        One instance per (model, key) is reused across calls, so its
+        client/channel stays warm. google-generativeai keeps one global
+        API key, and a model binds its client on its first request. Call
+        the returned model right away - before any await - so it picks
+        up this key.
+        """
+        genai = self._lazy_genai()
+        with self._key_lock:
+            if key != self._configured_key:
+                genai.configure(api_key=key)
+                self._configured_key = key
+            
+            model = self._models.get((model_name, key))
+            if model is None:
+                model = self._models[(model_name, key)] = genai.GenerativeModel(model_name)
+            return model
+    
+    def _on_key_error(self, key: str, exc: BaseException):
+        """Take a key out of the rotation for a while if it hit its quota."""
+        if not _is_rate_limited(exc) or len(self.api_keys) < 2:
+            return
+        
+        retry_after = getattr(exc, "retry_after", None) or KEY_COOLDOWN_SECONDS
+        with self._key_lock:
+            self._key_cooldown[key] = time.monotonic() + float(retry_after)
+        logger.warning(f"Gemini key ...{key[-4:]} rate limited, resting {retry_after}s")
+    
+    @staticmethod
+    def _estimate_tokens(prompt: str) -> int:
+        """
+        Rough prompt token count (~4 chars/token).
+        
+        Avoids model.count_tokens(), which is itself a billed API request.
+        """
+        return len(prompt) // 4 + 1
+    
+    def _select_model(self, contact_title: Optional[str]) -> str:
+        """Select model based on importance."""
+        if not contact_title:
+            return self.flash_model
+        
+        title_upper = contact_title.upper()
+        if any(keyword in title_upper for keyword in _EXEC_KEYWORDS):
+            return self.pro_model  # Use Pro for executives
+        return self.flash_model  # Flash for standard outreach
+    
+    @staticmethod
+    def _build_prompt(
+        company_name: str,
+        contact_name: Optional[str],
+        contact_title: Optional[str],
+        signals: Dict,
+        angle: str,
+        style: str,
+        json_output: bool = False
+    ) -> str:
+        """
+        Build the Gemini prompt for one lead.
+        
+        json_output asks for {"subject", "body"} JSON (used with JSON
+        mode); otherwise the SUBJECT:/BODY: text format, for streaming.
+        """
         # Build context
         context_parts = [f"Company: {company_name}"]
         if contact_name:
@@ -202,7 +914,12 @@ class SalesAgent:
         context = "\n".join(context_parts)
         signal_context = "\n".join(signal_parts) if signal_parts else "No specific signals available"
         
-        prompt = f"""You are a sales development representative for a light industrial staffing company.
+        if json_output:
+            output_format = 'Return a JSON object: {"subject": "<subject line>", "body": "<email body>"}'
+        else:
+            output_format = "Output format:\nSUBJECT: [subject line]\nBODY:\n[email body]"
+        
+        return f"""You are a sales development representative for a light industrial staffing company.
         
 Write a cold outreach email to a potential client. The email should:
 - Be {style} in tone
@@ -220,47 +937,65 @@ SIGNALS (use these to personalize):
 
 PRIMARY ANGLE: {angle}
 
-Output format:
-SUBJECT: [subject line]
-BODY:
-[email body]
+{output_format}
 """
-        
+    
+    @classmethod
+    def _parse_json_response(
+        cls,
+        text: str,
+        model_name: str,
+        angle: str,
+        generated_at: Optional[str] = None
+    ) -> Dict:
+        """Read a JSON-mode {"subject", "body"} response."""
         try:
-            response = model.generate_content(prompt)
-            
-            # Parse response
-            text = response.text
-            
-            # Extract subject and body
-            if "SUBJECT:" in text and "BODY:" in text:
-                subject_match = re.search(r'SUBJECT:\s*(.+?)(?=BODY:|$)', text, re.DOTALL)
-                body_match = re.search(r'BODY:\s*(.+)', text, re.DOTALL)
-                
-                subject = subject_match.group(1).strip() if subject_match else "Quick question"
-                body = body_match.group(1).strip() if body_match else text
-            else:
-                subject = "Quick question about your staffing needs"
-                body = text
-            
-            return {
-                "subject": subject,
-                "body": body,
-                "model": model_name,
-                "angle": angle,
-                "generated_at": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Gemini error: {e}")
-            raise
+            parsed = _json_loads(text)
+            subject, body = parsed["subject"].strip(), parsed["body"].strip()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Model ignored the schema - fall back to the text heuristics
+            return cls._parse_ai_response(text, model_name, angle, generated_at)
+        
+        return {
+            "subject": subject,
+            "body": body,
+            "model": model_name,
+            "angle": angle,
+            "generated_at": generated_at or datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _parse_ai_response(
+        text: str,
+        model_name: str,
+        angle: str,
+        generated_at: Optional[str] = None
+    ) -> Dict:
+        """Split a Gemini response into subject and body."""
+        # Extract subject and body
+        match = _SUBJECT_BODY_RE.search(text)
+        if match:
+            subject = match["subject"].strip()
+            body = match["body"].strip()
+        else:
+            subject = "Quick question about your staffing needs"
+            body = text
+        
+        return {
+            "subject": subject,
+            "body": body,
+            "model": model_name,
+            "angle": angle,
+            "generated_at": generated_at or datetime.now().isoformat()
+        }
     
     def _generate_from_template(
         self,
         company_name: str,
         contact_name: Optional[str],
         signals: Dict,
-        angle: str
+        angle: str,
+        generated_at: Optional[str] = None
     ) -> Dict:
         """Generate email from template (fallback)."""
         template = self.TEMPLATES.get(angle, self.TEMPLATES["expansion"])
@@ -296,55 +1031,145 @@ Best regards,
             "body": body,
             "model": "template",
             "angle": angle,
-            "generated_at": datetime.now().isoformat()
+            "generated_at": generated_at or datetime.now().isoformat()
         }
     
-    def process_hot_leads(self, min_score: int = 75) -> List[Dict]:
+    def process_hot_leads(
+        self,
+        min_score: int = 75,
+        concurrency: Optional[int] = None
+    ) -> List[Dict]:
         """
         Generate outreach for all hot leads.
         
+        Runs the Gemini calls concurrently; see process_hot_leads_async.
+        
         Args:
             min_score: Minimum propensity score
+            concurrency: Max requests in flight (default from settings)
             
         Returns:
             List of generated emails
         """
+        return asyncio.run(self.process_hot_leads_async(min_score, concurrency))
+    
+    async def process_hot_leads_async(
+        self,
+        min_score: int = 75,
+        concurrency: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Generate outreach for all hot leads with bounded concurrency.
+        
+        Args:
+            min_score: Minimum propensity score
+            concurrency: Max requests in flight (default from settings)
+            
+        Returns:
+            List of generated emails, in lead order
+        """
         logger.info(f"Processing hot leads (score >= {min_score})...")
         
         # Get hot leads from database
         hot_leads = db.get_hot_leads(min_score=min_score)
         
-        results = []
+        semaphore = asyncio.Semaphore(concurrency or settings.ai.gemini_concurrency)
+        batch_size = self._batch_size()
+        
+        # One timestamp for the whole run
+        generated_at = datetime.now().isoformat()
+        
+        if self.ai_enabled and batch_size > 1:
+            # Several leads per request to save RPM quota
+            batches = await asyncio.gather(*[
+                self._process_batch(hot_leads[i:i + batch_size], semaphore, generated_at)
+                for i in range(0, len(hot_leads), batch_size)
+            ])
+            results = [email for batch in batches for email in batch]
+        else:
+            emails = await asyncio.gather(*[
+                self._process_lead(lead, semaphore, generated_at) for lead in hot_leads
+            ])
+            results = [email for email in emails if email is not None]
         
-        for lead in hot_leads:
+        logger.info(f"Generated {len(results)} outreach emails")
+        return results
+    
+    async def _process_lead(
+        self,
+        lead: Dict,
+        semaphore: asyncio.Semaphore,
+        generated_at: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Generate outreach for one hot lead, or None on error."""
+        async with semaphore:
             try:
-                # Build signals dict from lead data
-                signals = {
-                    "permit_value": lead.get("permit_value"),
-                    "job_count_30d": lead.get("job_post_count_30d"),
-                    "local_unemployment_rate": lead.get("local_unemployment_rate"),
-                    "glassdoor_rating": lead.get("glassdoor_rating"),
-                }
-                
-                # Generate email
-                email = self.generate_outreach(
+                email = await self.generate_outreach_async(
                     company_name=lead.get("company_name", "Company"),
-                    signals=signals
+                    signals=self._lead_signals(lead),
+                    generated_at=generated_at
                 )
-                
-                email["company_id"] = lead.get("id")
-                email["company_name"] = lead.get("company_name")
-                email["propensity_score"] = lead.get("propensity_score")
-                
-                results.append(email)
-                
             except Exception as e:
                 logger.error(f"Error processing {lead.get('company_name')}: {e}")
-                continue
+                return None
         
-        logger.info(f"Generated {len(results)} outreach emails")
+        return self._tag_lead_email(email, lead)
+    
+    async def _process_batch(
+        self,
+        leads: List[Dict],
+        semaphore: asyncio.Semaphore,
+        generated_at: Optional[str] = None
+    ) -> List[Dict]:
+        """Generate outreach for a batch of leads with one Gemini request."""
+        async with semaphore:
+            try:
+                generated = await self._generate_batch_with_ai_async(leads, generated_at)
+            except Exception as e:
+                logger.warning(f"Batch AI generation failed: {e}")
+                logger.info("Falling back to templates for this batch...")
+                generated = [None] * len(leads)
+        
+        results = []
+        for lead, email in zip(leads, generated):
+            if email is None:
+                signals = self._lead_signals(lead)
+                email = self._generate_from_template(
+                    company_name=lead.get("company_name", "Company"),
+                    contact_name=None,
+                    signals=signals,
+                    angle=self._select_angle(signals),
+                    generated_at=generated_at
+                )
+            results.append(self._tag_lead_email(email, lead))
         return results
     
+    @staticmethod
+    def _tag_lead_email(email: Dict, lead: Dict) -> Dict:
+        """Attach the lead's identifiers to a generated email."""
+        email["company_id"] = lead.get("id")
+        email["company_name"] = lead.get("company_name")
+        email["propensity_score"] = lead.get("propensity_score")
+        return email
+    
+    @staticmethod
+    def _batch_size() -> int:
+        """Leads per batched request, capped by the output token budget."""
+        return max(1, min(
+            settings.ai.gemini_batch_size,
+            MAX_OUTPUT_TOKENS // EMAIL_OUTPUT_TOKENS
+        ))
+    
+    @staticmethod
+    def _lead_signals(lead: Dict) -> Dict:
+        """Build signals dict from hot lead data."""
+        return {
+            "permit_value": lead.get("permit_value"),
+            "job_count_30d": lead.get("job_post_count_30d"),
+            "local_unemployment_rate": lead.get("local_unemployment_rate"),
+            "glassdoor_rating": lead.get("glassdoor_rating"),
+        }
+    
     def validate_email(self, email: str) -> Dict:
         """
         Validate an email address (syntax + MX record check).
@@ -355,6 +1180,71 @@ Best regards,
         Returns:
             Dict with validation results
         """
+        result, domain = self._check_syntax(email)
+        if domain is None:
+            return result
+        
+        # Check MX record
+        has_mx = self._mx_cached(domain)
+        if has_mx is None:
+            try:
+                mx_records = self._dns_resolver().resolve(domain, 'MX')
+                has_mx = len(mx_records) > 0
+                self._mx_store(domain, has_mx)
+            except Exception as e:
+                has_mx = False
+                self._mx_store_failure(domain, e)
+        
+        result["has_mx_record"] = has_mx
+        result["deliverable"] = has_mx
+        return result
+    
+    async def validate_email_async(self, email: str) -> Dict:
+        """Async version of validate_email() - shares the same MX cache."""
+        result, domain = self._check_syntax(email)
+        if domain is None:
+            return result
+        
+        has_mx = self._mx_cached(domain)
+        if has_mx is None:
+            try:
+                mx_records = await self._dns_resolver_async().resolve(domain, 'MX')
+                has_mx = len(mx_records) > 0
+                self._mx_store(domain, has_mx)
+            except Exception as e:
+                has_mx = False
+                self._mx_store_failure(domain, e)
+        
+        result["has_mx_record"] = has_mx
+        result["deliverable"] = has_mx
+        return result
+    
+    async def validate_emails_async(
+        self,
+        emails: List[str],
+        concurrency: int = 50
+    ) -> List[Dict]:
+        """
+        Validate many addresses concurrently.
+        
+        Args:
+            emails: Addresses to validate
+            concurrency: Maximum DNS lookups in flight
+            
+        Returns:
+            Validation results in input order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def validate(email: str) -> Dict:
+            async with semaphore:
+                return await self.validate_email_async(email)
+        
+        return await asyncio.gather(*(validate(email) for email in emails))
+    
+    @staticmethod
+    def _check_syntax(email: str) -> Tuple[Dict, Optional[str]]:
+        """Syntax check. Returns (result, domain) - domain is None if invalid."""
         result = {
             "email": email,
             "valid_syntax": False,
@@ -362,60 +1252,156 @@ Best regards,
             "deliverable": False
         }
         
-        # Check syntax
+        from email.utils import parseaddr
+        
         _, addr = parseaddr(email)
         if not addr or "@" not in addr:
-            return result
+            return result, None
         
         result["valid_syntax"] = True
-        
-        # Check MX record
-        domain = addr.split("@")[1]
+        return result, addr.split("@")[1].lower()
+    
+    def _dns_resolver(self):
+        """Shared resolver with a capped per-lookup timeout."""
+        if self._resolver is None:
+            import dns.resolver
+            resolver = dns.resolver.Resolver()
+            resolver.lifetime = MX_LOOKUP_TIMEOUT
+            self._resolver = resolver
+        return self._resolver
+    
+    def _dns_resolver_async(self):
+        """Async counterpart of _dns_resolver()."""
+        if self._async_resolver is None:
+            import dns.asyncresolver
+            resolver = dns.asyncresolver.Resolver()
+            resolver.lifetime = MX_LOOKUP_TIMEOUT
+            self._async_resolver = resolver
+        return self._async_resolver
+    
+    def _mx_cached(self, domain: str) -> Optional[bool]:
+        """Cached MX result for a domain, or None if unknown/expired."""
+        with self._mx_lock:
+            entry = self._mx_cache.get(domain)
+            if entry is None:
+                return None
+            has_mx, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._mx_cache[domain]
+                return None
+            return has_mx
+    
+    def _mx_store(self, domain: str, has_mx: bool, ttl: float = MX_CACHE_TTL):
+        """Cache an MX result, evicting the oldest entry when full."""
+        with self._mx_lock:
+            if len(self._mx_cache) >= MX_CACHE_MAX and domain not in self._mx_cache:
+                del self._mx_cache[next(iter(self._mx_cache))]
+            self._mx_cache[domain] = (has_mx, time.monotonic() + ttl)
+    
+    def _mx_store_failure(self, domain: str, exc: Exception):
+        """Negative-cache a failed lookup, for longer if the domain is dead."""
         try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            result["has_mx_record"] = len(mx_records) > 0
-            result["deliverable"] = result["has_mx_record"]
-        except Exception:
-            pass
+            import dns.exception
+            import dns.resolver
+        except ImportError:
+            return
         
-        return result
+        if isinstance(exc, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+            self._mx_store(domain, False, MX_NEGATIVE_TTL)
+        elif isinstance(exc, dns.exception.Timeout):
+            self._mx_store(domain, False, MX_TIMEOUT_TTL)
     
-    def permute_email(self, first_name: str, last_name: str, domain: str) -> List[str]:
+    def permute_email(self, first_name: str, last_name: str, domain: str) -> Iterator[str]:
         """
         Generate possible email permutations for a contact.
         
+        Lazy, so callers that stop at the first hit don't format the rest;
+        wrap in list() for all of them.
+        
         Args:
             first_name: Contact's first name
             last_name: Contact's last name
             domain: Company domain
             
-        Returns:
-            List of possible email addresses
+        Yields:
+            Possible email addresses, most likely first
         """
         first = first_name.lower().strip()
         last = last_name.lower().strip()
         
         # Common patterns (ordered by likelihood)
-        patterns = [
-            f"{first}.{last}@{domain}",
-            f"{first}{last}@{domain}",
-            f"{first[0]}{last}@{domain}",
-            f"{first}_{last}@{domain}",
-            f"{first}@{domain}",
-            f"{last}.{first}@{domain}",
-            f"{first[0]}.{last}@{domain}",
-            f"{first}{last[0]}@{domain}",
-        ]
+        yield f"{first}.{last}@{domain}"
+        yield f"{first}{last}@{domain}"
+        yield f"{first[0]}{last}@{domain}"
+        yield f"{first}_{last}@{domain}"
+        yield f"{first}@{domain}"
+        yield f"{last}.{first}@{domain}"
+        yield f"{first[0]}.{last}@{domain}"
+        yield f"{first}{last[0]}@{domain}"
+    
+    def find_first_valid_email(
+        self,
+        first_name: str,
+        last_name: str,
+        domain: str
+    ) -> Optional[str]:
+        """
+        Most likely deliverable address for a contact.
         
-        return patterns
+        Args:
+            first_name: Contact's first name
+            last_name: Contact's last name
+            domain: Company domain
+            
+        Returns:
+            First permutation that validates as deliverable, or None
+        """
+        for email in self.permute_email(first_name, last_name, domain):
+            if self.validate_email(email)["deliverable"]:
+                return email
+        return None
 
 
 # ===========================================
 # STANDALONE EXECUTION
 # ===========================================
 
+def cache_command(argv: List[str]):
+    """
+    Inspect or clear the Gemini output cache.
+    
+    Usage:
+        python -m orchestration.sales_agent cache --list
+        python -m orchestration.sales_agent cache --clear
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="sales_agent cache")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--list", action="store_true", help="List cached entries")
+    group.add_argument("--clear", action="store_true", help="Delete all entries")
+    args = parser.parse_args(argv)
+    
+    cache = GeminiCache()
+    
+    if args.clear:
+        print(f"🗑️  Removed {cache.clear()} cached entries")
+        return
+    
+    entries = cache.list_entries()
+    print(f"💾 {len(entries)} cached entries ({cache.path})")
+    for entry in entries:
+        created = datetime.fromtimestamp(entry["created_at"]).strftime("%Y-%m-%d %H:%M")
+        status = " (expired)" if entry["expired"] else ""
+        print(f"  • {entry['key'][:12]}  {entry['model']}  {created}{status}")
+
+
 def main():
     """Demo the sales agent."""
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        cache_command(sys.argv[2:])
+        return
+    
     logger.remove()
     logger.add(
         sys.stderr,
@@ -464,13 +1450,28 @@ def main():
     print(f"Subject: {email2['subject']}")
     print(f"\n{email2['body']}")
     
+    # Example 3: Streaming (prints text as it arrives)
+    print("\n\n📧 EXAMPLE 3: Streaming Generation")
+    print("-" * 40)
+    
+    for event in agent.generate_outreach_stream(
+        company_name="Metro Fulfillment Center",
+        signals={"market_tightness_score": 75, "local_unemployment_rate": 3.1}
+    ):
+        if event["type"] == "chunk":
+            print(event["text"], end="", flush=True)
+        else:
+            if event["model"] == "template":
+                print(f"Subject: {event['subject']}\n\n{event['body']}")
+            print(f"\n[Generated by: {event['model']} | Angle: {event['angle']}]")
+    
     # Email permutation example
     print("\n\n📮 EMAIL PERMUTATION EXAMPLE")
     print("-" * 40)
     
     permutations = agent.permute_email("John", "Smith", "acmelogistics.com")
     print("Possible emails for John Smith @ Acme Logistics:")
-    for email in permutations[:5]:
+    for email in itertools.islice(permutations, 5):
         print(f"  • {email}")
 
 
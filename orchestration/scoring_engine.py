@@ -17,11 +17,14 @@ SCORE INTERPRETATION:
 """
 
 import sys
+from bisect import bisect_right
 from pathlib import Path
 from datetime import datetime, date
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+import numpy as np
 from loguru import logger
 
 # Add project root to path
@@ -42,6 +45,64 @@ class SignalScores:
     market_tightness: float = 0.0  # Pipeline 7: Labor
 
 
+# Breakdown order returned by _calculate_cached
+BREAKDOWN_FACTORS = (
+    "expansion", "distress", "job_velocity",
+    "sentiment", "market_tightness", "turnover",
+)
+
+
+# Tier boundaries: a score at or above TIER_THRESHOLDS[i] earns TIER_LABELS[i + 1]
+TIER_THRESHOLDS = (40, 60, 80)
+TIER_LABELS = ("cold", "cool", "warm", "hot")
+_TIER_THRESHOLDS_ARRAY = np.array(TIER_THRESHOLDS, dtype=np.float64)
+_TIER_LABELS_ARRAY = np.array(TIER_LABELS)
+
+
+@lru_cache(maxsize=4096)
+def _calculate_cached(
+    expansion: float,
+    distress: float,
+    job_velocity: float,
+    sentiment: float,
+    market_tightness: float,
+    turnover: float,
+    macro_modifier: float,
+    weights: Tuple[float, ...]
+) -> Tuple[float, float, Tuple[float, ...]]:
+    """
+    Pure scoring kernel, memoized on the signal values + weights.
+    
+    Companies whose signal_history hasn't changed produce the same
+    inputs run after run, so repeats are a dict lookup.
+    
+    Returns:
+        (final_score, base_score, breakdown) - final_score unrounded so
+        tiering sees the exact value; the rest rounded to 1 decimal,
+        breakdown in BREAKDOWN_FACTORS order
+    """
+    contributions = (
+        expansion * weights[0],
+        distress * weights[1],
+        job_velocity * weights[2],
+        sentiment * weights[3],
+        market_tightness * weights[4],
+        turnover * weights[5],
+    )
+    
+    # Calculate weighted base score
+    base_score = sum(contributions)
+    
+    # Apply macro modifier and clamp to 0-100
+    final_score = min(max(base_score * macro_modifier, 0), 100)
+    
+    return (
+        final_score,
+        round(base_score, 1),
+        tuple(round(c, 1) for c in contributions),
+    )
+
+
 class ScoringEngine:
     """
     Calculates propensity scores for companies.
@@ -74,6 +135,9 @@ class ScoringEngine:
     def __init__(self):
         """Initialize with configured weights."""
         self.weights = settings.weights
+        self._weights_tuple = tuple(
+            getattr(self.weights, name) for name in self.weights.FIELDS
+        )
         
         # Validate weights sum to 1.0
         if not self.weights.validate_weights():
@@ -98,109 +162,142 @@ class ScoringEngine:
         Returns:
             Dict with final score and breakdown
         """
-        # Calculate weighted base score
-        base_score = (
-            signals.expansion * self.weights.expansion +
-            signals.distress * self.weights.distress +
-            signals.job_velocity * self.weights.job_velocity +
-            signals.sentiment * self.weights.sentiment +
-            signals.market_tightness * self.weights.market_tightness +
-            signals.turnover * self.weights.macro
+        final_score, base_score, breakdown = _calculate_cached(
+            signals.expansion,
+            signals.distress,
+            signals.job_velocity,
+            signals.sentiment,
+            signals.market_tightness,
+            signals.turnover,
+            signals.macro_modifier,
+            self._weights_tuple
         )
         
-        # Apply macro modifier
-        final_score = base_score * signals.macro_modifier
-        
-        # Clamp to 0-100
-        final_score = min(max(final_score, 0), 100)
-        
-        # Classify tier
-        tier = self._classify_tier(final_score)
-        
         return {
             "propensity_score": round(final_score, 1),
-            "score_tier": tier,
-            "base_score": round(base_score, 1),
+            "score_tier": self._classify_tier(final_score),
+            "base_score": base_score,
             "macro_modifier": signals.macro_modifier,
-            "breakdown": {
-                "expansion": round(signals.expansion * self.weights.expansion, 1),
-                "distress": round(signals.distress * self.weights.distress, 1),
-                "job_velocity": round(signals.job_velocity * self.weights.job_velocity, 1),
-                "sentiment": round(signals.sentiment * self.weights.sentiment, 1),
-                "market_tightness": round(signals.market_tightness * self.weights.market_tightness, 1),
-                "turnover": round(signals.turnover * self.weights.macro, 1),
-            }
+            "breakdown": dict(zip(BREAKDOWN_FACTORS, breakdown))
         }
     
     @staticmethod
     def _classify_tier(score: float) -> str:
         """Classify score into tier."""
-        if score >= 80:
-            return "hot"
-        elif score >= 60:
-            return "warm"
-        elif score >= 40:
-            return "cool"
-        else:
-            return "cold"
+        return TIER_LABELS[bisect_right(TIER_THRESHOLDS, score)]
     
-    def score_company(self, company_id: str) -> Optional[Dict]:
+    def score_company(
+        self,
+        company_id: str,
+        scored_at: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Calculate propensity score for a specific company.
         
-        Fetches the latest signals from the database and calculates score.
+        Fetches the company and its latest signals in one query and
+        calculates score.
         
         Args:
             company_id: UUID of the company
+            scored_at: Timestamp to stamp on the result (default now)
             
         Returns:
             Dict with score and metadata
         """
-        # Get company info
-        company = db.get_by_id("company_master", company_id)
-        if not company:
+        # Get company info + latest signal history
+        rows = db.get_companies_with_latest_signals(limit=1, company_id=company_id)
+        if not rows:
             logger.warning(f"Company not found: {company_id}")
             return None
         
-        # Get latest signal history
-        signals_list = db.query(
-            "signal_history",
-            filters={"company_id": company_id},
-            order_by="-record_date",
-            limit=1
-        )
-        
-        if signals_list:
-            signals_data = signals_list[0]
-        else:
-            signals_data = {}
-        
-        # Build SignalScores object
-        signals = SignalScores(
-            expansion=signals_data.get("expansion_score", 0) or 0,
-            distress=signals_data.get("distress_score", 0) or 0,
-            sentiment=signals_data.get("sentiment_score", 0) or 0,
-            job_velocity=signals_data.get("job_velocity_score", 0) or 0,
-            turnover=signals_data.get("turnover_score", 0) or 0,
-            market_tightness=signals_data.get("market_tightness_score", 0) or 0,
-            macro_modifier=signals_data.get("macro_modifier", 1.0) or 1.0
-        )
+        company = rows[0]
+        signals = self._signals_from_row(company)
         
         # Calculate score
         result = self.calculate_score(signals)
         
         # Add company info
-        result["company_id"] = company_id
-        result["company_name"] = company.get("company_name")
-        result["city"] = company.get("city")
-        result["state"] = company.get("state")
-        result["scored_at"] = datetime.now().isoformat()
+        self._add_company_info(result, company, scored_at or datetime.now().isoformat())
         
         # Save to database
         self._save_score(company_id, result, signals)
         
         return result
     
+    @staticmethod
+    def _signals_from_row(signals_data: Dict) -> SignalScores:
+        """Build SignalScores from a signal_history row (missing -> defaults)."""
+        return SignalScores(
+            expansion=float(signals_data.get("expansion_score", 0) or 0),
+            distress=float(signals_data.get("distress_score", 0) or 0),
+            sentiment=float(signals_data.get("sentiment_score", 0) or 0),
+            job_velocity=float(signals_data.get("job_velocity_score", 0) or 0),
+            turnover=float(signals_data.get("turnover_score", 0) or 0),
+            market_tightness=float(signals_data.get("market_tightness_score", 0) or 0),
+            macro_modifier=float(signals_data.get("macro_modifier", 1.0) or 1.0)
+        )
+    
+    @staticmethod
+    def _add_company_info(result: Dict, company: Dict, scored_at: str):
+        """Attach company metadata to a score result."""
+        result["company_id"] = company.get("id")
+        result["company_name"] = company.get("company_name")
+        result["city"] = company.get("city")
+        result["state"] = company.get("state")
+        result["scored_at"] = scored_at
+    
+    def score_batch(self, signals_list: List[SignalScores]) -> List[Dict]:
+        """
+        Vectorized calculate_score over many companies at once.
+        
+        Builds an (N, 6) signal matrix and does the weighted sum as a
+        single matrix-vector product instead of N Python-level sums.
+        
+        Args:
+            signals_list: SignalScores per company
+            
+        Returns:
+            List of result dicts, same shape as calculate_score()
+        """
+        if not signals_list:
+            return []
+        
+        # Columns in BREAKDOWN_FACTORS order, which matches weights.FIELDS
+        matrix = np.array(
+            [
+                (s.expansion, s.distress, s.job_velocity,
+                 s.sentiment, s.market_tightness, s.turnover)
+                for s in signals_list
+            ],
+            dtype=np.float64
+        )
+        macro = np.array([s.macro_modifier for s in signals_list], dtype=np.float64)
+        
+        contributions = matrix * self.weights.as_vector()
+        base_scores = contributions.sum(axis=1)
+        final_scores = np.clip(base_scores * macro, 0, 100)
+        tiers = _TIER_LABELS_ARRAY[
+            np.searchsorted(_TIER_THRESHOLDS_ARRAY, final_scores, side="right")
+        ]
+        
+        # Round everything in three calls, then drop back to Python lists
+        # (.tolist() yields plain floats/str, no per-element conversion)
+        final_rounded = np.round(final_scores, 1).tolist()
+        base_rounded = np.round(base_scores, 1).tolist()
+        breakdowns = np.round(contributions, 1).tolist()
+        tiers = tiers.tolist()
+        
+        return [
+            {
+                "propensity_score": final_rounded[i],
+                "score_tier": tiers[i],
+                "base_score": base_rounded[i],
+                "macro_modifier": signals.macro_modifier,
+                "breakdown": dict(zip(BREAKDOWN_FACTORS, breakdowns[i]))
+            }
+            for i, signals in enumerate(signals_list)
+        ]
+    
     def _save_score(
         self, 
         company_id: str, 
@@ -211,22 +308,31 @@ class ScoringEngine:
         try:
             db.save_signal_history(
                 company_id=company_id,
-                signals={
-                    "propensity_score": int(result["propensity_score"]),
-                    "score_tier": result["score_tier"],
-                    "expansion_score": signals.expansion,
-                    "distress_score": signals.distress,
-                    "sentiment_score": signals.sentiment,
-                    "job_velocity_score": signals.job_velocity,
-                    "turnover_score": signals.turnover,
-                    "market_tightness_score": signals.market_tightness,
-                    "macro_modifier": signals.macro_modifier,
-                    "record_date": date.today().isoformat()
-                }
+                signals=self._signal_record(result, signals)
             )
         except Exception as e:
             logger.error(f"Error saving score: {e}")
     
+    @staticmethod
+    def _signal_record(
+        result: Dict,
+        signals: SignalScores,
+        record_date: Optional[str] = None
+    ) -> Dict:
+        """signal_history columns for a calculated score."""
+        return {
+            "propensity_score": int(result["propensity_score"]),
+            "score_tier": result["score_tier"],
+            "expansion_score": signals.expansion,
+            "distress_score": signals.distress,
+            "sentiment_score": signals.sentiment,
+            "job_velocity_score": signals.job_velocity,
+            "turnover_score": signals.turnover,
+            "market_tightness_score": signals.market_tightness,
+            "macro_modifier": signals.macro_modifier,
+            "record_date": record_date or date.today().isoformat()
+        }
+    
     def score_all(self, limit: int = 100) -> List[Dict]:
         """
         Score all companies in the database.
@@ -239,18 +345,36 @@ class ScoringEngine:
         """
         logger.info("Scoring all companies...")
         
-        # Get all companies
-        companies = db.query("company_master", limit=limit)
+        # Get all companies joined to their latest signals in one query
+        companies = db.get_companies_with_latest_signals(limit=limit)
+        
+        signals_list = [self._signals_from_row(company) for company in companies]
+        
+        # One timestamp for the whole batch
+        now = datetime.now()
+        scored_at = now.isoformat()
+        record_date = now.date().isoformat()
         
         results = []
-        for company in companies:
-            try:
-                result = self.score_company(company["id"])
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Error scoring {company.get('company_name')}: {e}")
-                continue
+        records = []
+        for company, signals, result in zip(
+            companies, signals_list, self.score_batch(signals_list)
+        ):
+            self._add_company_info(result, company, scored_at)
+            results.append(result)
+            records.append({
+                "company_id": company["id"],
+                **self._signal_record(result, signals, record_date)
+            })
+        
+        # Save every score in one upsert instead of one per company
+        try:
+            db.save_signal_history_bulk(
+                records,
+                max_workers=settings.database.max_workers
+            )
+        except Exception as e:
+            logger.error(f"Error saving scores: {e}")
         
         # Sort by score
         results.sort(key=lambda x: x["propensity_score"], reverse=True)
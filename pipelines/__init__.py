@@ -48,13 +48,53 @@ __all__ = [
 ]
 
 
-def run_all_pipelines():
+# Pipelines run by run_all_pipelines():
+# (number, result key, label, class, optional follow-up). A follow-up is
+# (result key, method, pass run() result) - passing the result lets the
+# method reuse it instead of re-fetching everything.
+PIPELINES = [
+    (1, "permits", "Building Permits", PermitPipeline, None),
+    (2, "warn", "WARN Notices", WARNPipeline, None),
+    (3, "macro", "Economic Indicators", MacroPipeline, ("macro_modifier", "get_macro_modifier", True)),
+    (5, "jobs", "Job Postings", JobPipeline, None),
+    (7, "labor", "Labor Market", LaborMarketPipeline, ("labor_summary", "get_regional_summary", False)),
+]
+
+# Follow-up results used when their pipeline fails
+FOLLOW_UP_DEFAULTS = {"macro_modifier": 1.0}
+
+
+def _run_pipeline(number, label, pipeline_cls, follow_up):
+    """Run one pipeline (plus its follow-up call, once run() is done)."""
+    from loguru import logger
+    
+    logger.info(f"\n[{number}/7] {label}...")
+    pipeline = pipeline_cls()
+    result = pipeline.run()
+    
+    extra = None
+    if follow_up:
+        _, method, takes_result = follow_up
+        follow = getattr(pipeline, method)
+        extra = follow(result) if takes_result else follow()
+    return result, extra
+
+
+def run_all_pipelines(max_workers: int = len(PIPELINES)):
     """
-    Convenience function to run all pipelines sequentially.
+    Convenience function to run all pipelines.
+    
+    The independent, network-bound pipelines run concurrently in a
+    thread pool, so total time is roughly the slowest pipeline rather
+    than the sum of all of them.
+    
+    Args:
+        max_workers: Pipelines to run at once (1 = sequential)
     
     Returns:
         Dict with results from each pipeline
     """
+    from concurrent.futures import ThreadPoolExecutor
     from loguru import logger
     
     logger.info("=" * 60)
@@ -63,62 +103,31 @@ def run_all_pipelines():
     
     results = {}
     
-    # Pipeline 1: Building Permits
-    try:
-        logger.info("\n[1/7] Building Permits...")
-        p1 = PermitPipeline()
-        results["permits"] = p1.run()
-    except Exception as e:
-        logger.error(f"Pipeline 1 failed: {e}")
-        results["permits"] = None
-    
-    # Pipeline 2: WARN Notices
-    try:
-        logger.info("\n[2/7] WARN Notices...")
-        p2 = WARNPipeline()
-        results["warn"] = p2.run()
-    except Exception as e:
-        logger.error(f"Pipeline 2 failed: {e}")
-        results["warn"] = None
-    
-    # Pipeline 3: Macro Economic
-    try:
-        logger.info("\n[3/7] Economic Indicators...")
-        p3 = MacroPipeline()
-        results["macro"] = p3.run()
-        results["macro_modifier"] = p3.get_macro_modifier()
-    except Exception as e:
-        logger.error(f"Pipeline 3 failed: {e}")
-        results["macro"] = None
-        results["macro_modifier"] = 1.0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            key: pool.submit(_run_pipeline, number, label, pipeline_cls, follow_up)
+            for number, key, label, pipeline_cls, follow_up in PIPELINES
+        }
+        
+        for number, key, label, pipeline_cls, follow_up in PIPELINES:
+            try:
+                results[key], extra = futures[key].result()
+                if follow_up:
+                    results[follow_up[0]] = extra
+            except Exception as e:
+                logger.error(f"Pipeline {number} failed: {e}")
+                results[key] = None
+                if follow_up and follow_up[0] in FOLLOW_UP_DEFAULTS:
+                    results[follow_up[0]] = FOLLOW_UP_DEFAULTS[follow_up[0]]
     
     # Pipeline 4: Glassdoor (skip in bulk - rate limited)
     logger.info("\n[4/7] Glassdoor Sentiment... (on-demand only)")
     results["glassdoor"] = "On-demand - see GlassdoorPipeline"
     
-    # Pipeline 5: Job Postings
-    try:
-        logger.info("\n[5/7] Job Postings...")
-        p5 = JobPipeline()
-        results["jobs"] = p5.run()
-    except Exception as e:
-        logger.error(f"Pipeline 5 failed: {e}")
-        results["jobs"] = None
-    
     # Pipeline 6: Inventory (requires tickers)
     logger.info("\n[6/7] Inventory Turnover... (requires ticker list)")
     results["inventory"] = "Requires ticker input - see InventoryPipeline"
     
-    # Pipeline 7: Labor Market
-    try:
-        logger.info("\n[7/7] Labor Market...")
-        p7 = LaborMarketPipeline()
-        results["labor"] = p7.run()
-        results["labor_summary"] = p7.get_regional_summary()
-    except Exception as e:
-        logger.error(f"Pipeline 7 failed: {e}")
-        results["labor"] = None
-    
     logger.info("\n" + "=" * 60)
     logger.info("✅ ALL PIPELINES COMPLETE")
     logger.info("=" * 60)
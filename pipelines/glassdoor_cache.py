@@ -0,0 +1,50 @@
+"""
+💾 GLASSDOOR SENTIMENT CACHE
+============================
+Persistent on-disk cache for scraped Glassdoor ratings, keyed by company.
+
+Daily runs look up largely the same companies; a hit skips both the search
+and the page fetch, which is exactly the traffic Glassdoor blocks after.
+Companies that couldn't be found are remembered too (briefly), so unknown
+names aren't re-searched on every call.
+"""
+
+from database.ttl_cache import CACHE_DIR, TTLCache
+
+
+DEFAULT_CACHE_PATH = CACHE_DIR / "glassdoor.sqlite"
+
+
+class GlassdoorCache(TTLCache):
+    """
+    Key/value cache of sentiment results with per-entry expiry.
+    
+    Usage:
+        cache = GlassdoorCache()
+        key = GlassdoorCache.make_key("Amazon")
+        
+        sentiment = cache.get(key)
+        if sentiment is None and not cache.is_miss(key):
+            sentiment = scrape(...)
+            if sentiment:
+                cache.set(key, sentiment, ttl_seconds=7 * 86400)
+            else:
+                cache.set_miss(key, ttl_seconds=3600)
+    """
+    
+    DEFAULT_PATH = DEFAULT_CACHE_PATH
+    LEGACY_TABLE = "glassdoor_cache"
+    
+    @staticmethod
+    def make_key(company_name: str) -> str:
+        """Cache key for a company (case and whitespace insensitive)."""
+        return " ".join(company_name.lower().split())
+    
+    def is_miss(self, key: str) -> bool:
+        """True if the company was recently looked up and not found."""
+        row = self._lookup(key)
+        return row is not None and row[0] is None
+    
+    def set_miss(self, key: str, ttl_seconds: float):
+        """Remember that a lookup found nothing."""
+        self._store(key, None, ttl_seconds)
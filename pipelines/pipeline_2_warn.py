@@ -14,14 +14,26 @@ DATA SOURCE: warn-scraper library (free, scrapes state websites)
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+import json
 import re
 import tempfile
 
+import numpy as np
 import pandas as pd
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import pyarrow  # noqa: F401 - backs "string[pyarrow]" and Parquet I/O
+    ARROW_STRINGS = True
+except ImportError:  # Optional - plain pandas strings (Python objects) instead
+    ARROW_STRINGS = False
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -29,6 +41,191 @@ from config.settings import settings, WARN_STATES
 from database.connection import db
 
 
+# Industrial keywords for filtering (compiled once at import)
+WARN_INDUSTRIAL_KEYWORDS = (
+    "logistics", "warehouse", "distribution", "fulfillment",
+    "manufacturing", "assembly", "packaging", "freight",
+    "trucking", "shipping", "supply chain", "3pl",
+    "cold storage", "food processing", "industrial"
+)
+# Longest keywords first, so an alternative that is a prefix of another
+# never matches ahead of it. Spaces stay unescaped so the pattern is also
+# valid RE2 (Arrow's linear-time engine)
+WARN_INDUSTRIAL_PATTERN = re.compile(
+    "|".join(
+        re.escape(kw).replace("\\ ", " ")
+        for kw in sorted(WARN_INDUSTRIAL_KEYWORDS, key=len, reverse=True)
+    ),
+    re.IGNORECASE
+)
+
+# Text columns are held as contiguous Arrow UTF-8 when pyarrow is present,
+# so .str.contains() runs in Arrow's C++ kernels instead of per Python str
+STRING_DTYPE = "string[pyarrow]" if ARROW_STRINGS else "string"
+
+# Canonical column -> the names states publish it under, in priority order
+COLUMN_ALIASES: Dict[str, List[str]] = {
+    "company_name": ["company_name", "JOB_SITE_NAME"],
+    "notice_date": ["notice_date", "NOTICE_DATE"],
+    "effective_date": ["effective_date", "LAYOFF_DATE"],
+    "affected_count": ["affected_count", "TOTAL_LAYOFF_NUMBER"],
+    "city": ["city", "CITY_NAME"],
+    "zip_code": ["zip_code", "ZIP_CODE"],
+}
+
+# Texas TWC workbook: the only columns read, and their canonical names
+TEXAS_WARN_URL = "https://www.twc.texas.gov/files/news/warn-act-listings-702.xlsx"
+TEXAS_CACHE_DIR = Path.home() / ".cache" / "propensity" / "warn"
+TEXAS_COLUMNS = {
+    "JOB_SITE_NAME": "company_name",
+    "NOTICE_DATE": "notice_date",
+    "LAYOFF_DATE": "effective_date",
+    "TOTAL_LAYOFF_NUMBER": "affected_count",
+    "CITY_NAME": "city",
+    "ZIP_CODE": "zip_code",
+}
+
+# Columnar snapshot of each run's notices, one file per day; only the
+# newest WARN_SNAPSHOT_KEEP are kept
+WARN_SNAPSHOT_DIR = Path.home() / ".cache" / "propensity" / "warn_snapshots"
+WARN_SNAPSHOT_KEEP = 7
+
+# States _fallback_fetch can read without warn-scraper
+DIRECT_FETCH_STATES = frozenset(("TX",))
+
+# Candidate date / company-name columns, first present wins
+DATE_COLUMNS = ["notice_date", "NOTICE_DATE", "date", "Date"]
+NAME_COLUMNS = ["company_name", "JOB_SITE_NAME", "EMPLOYER_NAME", "Company"]
+
+# Returned by get_nearby_warn_notices
+NEARBY_NOTICE_COLUMNS = "company_name,city,zip_code,notice_date,affected_count,layoff_type"
+
+# Free-text columns checked for closure/relocation wording
+LAYOFF_TEXT_COLUMNS = ["company_name", "description", "layoff_type", "LAYOFF_TYPE"]
+
+
+# Every raw column anything downstream reads (matched case-insensitively
+# when loading scraper CSVs, so nothing else is parsed or kept)
+WARN_CSV_COLUMNS = frozenset(
+    col.lower()
+    for col in (
+        *DATE_COLUMNS, *NAME_COLUMNS, *LAYOFF_TEXT_COLUMNS,
+        *(alias for aliases in COLUMN_ALIASES.values() for alias in aliases)
+    )
+)
+
+# Text columns whose values must not be type-inferred (zips lose leading
+# zeros / gain ".0" as numbers)
+WARN_CSV_DTYPES = {"zip_code": STRING_DTYPE, "company_name": STRING_DTYPE, "city": STRING_DTYPE}
+
+# warn-scraper only writes CSVs to a directory; put that handoff in RAM
+# (tmpfs) where the host has one so it never touches a real disk
+SCRAPER_SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def read_warn_csv(csv_path: Path) -> pd.DataFrame:
+    """
+    Load a warn-scraper CSV, keeping only the columns we use.
+    
+    The header is read first so usecols/dtype can be restricted to the
+    columns this file actually has.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [col for col in header if col.lower() in WARN_CSV_COLUMNS]
+    
+    dtype = {}
+    for col in usecols:
+        canonical = next(
+            (name for name, aliases in COLUMN_ALIASES.items() if col in aliases),
+            col.lower()
+        )
+        if canonical in WARN_CSV_DTYPES:
+            dtype[col] = WARN_CSV_DTYPES[canonical]
+    
+    df = pd.read_csv(
+        csv_path,
+        usecols=usecols or None,
+        dtype=dtype or None,
+        engine="c",
+        low_memory=False
+    )
+    return to_string_columns(df)
+
+
+def to_string_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert every remaining object (Python str) column to STRING_DTYPE."""
+    text_cols = df.select_dtypes(include="object").columns
+    if len(text_cols):
+        df[text_cols] = df[text_cols].astype(STRING_DTYPE)
+    return df
+
+
+def _apply_mask(df: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+    """
+    Rows of df where mask is True, without a defensive .copy().
+    
+    All-True returns df itself and all-False an empty slice, so neither
+    case copies any column data.
+    """
+    if mask.all():
+        return df
+    if not mask.any():
+        return df.iloc[:0]
+    return df.loc[mask]
+
+
+def load_warn_snapshot(columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    Read the most recent WARN snapshot written by WARNPipeline.run().
+    
+    Args:
+        columns: Only these columns are decoded (Parquet is columnar)
+        
+    Returns:
+        DataFrame, or None if there's no snapshot (or no pyarrow)
+    """
+    if not ARROW_STRINGS:
+        return None
+    
+    snapshots = sorted(WARN_SNAPSHOT_DIR.glob("warn_*.parquet"))
+    if not snapshots:
+        return None
+    
+    return pd.read_parquet(snapshots[-1], columns=columns)
+
+
+def find_col(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    """First of candidates that df has, resolved once per frame (not per row)."""
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def canonicalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One column per COLUMN_ALIASES key, whatever the state called it.
+    
+    When several aliases are present the first non-null value wins, per
+    row. Missing columns come back all-null. Counts are downcast to the
+    smallest integer dtype that holds them (float only if some are missing).
+    """
+    columns = {}
+    for canonical, candidates in COLUMN_ALIASES.items():
+        present = [col for col in candidates if col in df.columns]
+        if not present:
+            columns[canonical] = pd.Series(None, index=df.index, dtype=object)
+            continue
+        
+        values = df[present[0]]
+        for col in present[1:]:
+            values = values.combine_first(df[col])
+        columns[canonical] = values
+    
+    columns["affected_count"] = pd.to_numeric(
+        columns["affected_count"], errors="coerce", downcast="integer"
+    )
+    
+    return pd.DataFrame(columns, index=df.index)
+
+
 class WARNPipeline:
     """
     Pipeline for collecting and processing WARN notice data.
@@ -50,22 +247,48 @@ class WARNPipeline:
         self.target_zips = set(settings.geography.zips_list)
         self.lookback_days = 90  # WARN notices are 60 days ahead, look back 90
         
-        # Industrial keywords for filtering
-        self.industrial_keywords = [
-            "logistics", "warehouse", "distribution", "fulfillment",
-            "manufacturing", "assembly", "packaging", "freight",
-            "trucking", "shipping", "supply chain", "3pl",
-            "cold storage", "food processing", "industrial"
-        ]
-        
-        self.industrial_pattern = re.compile(
-            "|".join(self.industrial_keywords),
-            re.IGNORECASE
+        # Shared, precompiled pattern for industrial keywords
+        self.industrial_keywords = list(WARN_INDUSTRIAL_KEYWORDS)
+        self.industrial_pattern = WARN_INDUSTRIAL_PATTERN
+        
+        # One keep-alive pool for direct fetches; transient errors are
+        # retried by the adapter with backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
         )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # State -> scraper module, resolved once (None: warn-scraper missing)
+        self._scrapers = self._load_scrapers()
         
         logger.info(f"WARNPipeline initialized:")
         logger.info(f"  - Target state: {self.target_state}")
         logger.info(f"  - Lookback: {self.lookback_days} days")
+        if self._scrapers is not None:
+            logger.info(f"  - Scrapers: {', '.join(sorted(self._scrapers)) or 'none'}")
+    
+    @staticmethod
+    def _load_scrapers() -> Optional[Dict[str, object]]:
+        """Look up the warn-scraper module for every WARN state."""
+        try:
+            from warn import scrapers
+        except ImportError:
+            logger.error("warn-scraper not installed. Run: pip install warn-scraper")
+            return None
+        
+        return {
+            state: getattr(scrapers, state.lower())
+            for state in WARN_STATES
+            if hasattr(scrapers, state.lower())
+        }
     
     def run(self) -> pd.DataFrame:
         """
@@ -78,44 +301,105 @@ class WARNPipeline:
         logger.info("⚠️ STARTING PIPELINE 2: WARN NOTICES")
         logger.info("=" * 50)
         
-        all_notices = []
+        by_state = {}
+        fetched_any = False
         
         # Process each state
-        states_to_process = [self.target_state] + [
-            s for s in WARN_STATES if s != self.target_state
-        ]
+        # Target state first, the rest in a stable order
+        states_to_process = [self.target_state] + sorted(
+            WARN_STATES - {self.target_state}
+        )
         
+        # Don't queue states nothing can fetch
+        available = set(self._scrapers or ()) | DIRECT_FETCH_STATES
         for state in states_to_process:
-            logger.info(f"\n📍 Processing: {state}")
+            if state not in available:
+                logger.warning(f"No scraper available for {state}")
+        states_to_process = [state for state in states_to_process if state in available]
+        
+        # Scrape states in parallel (network-bound, each scraper writes to
+        # its own temp dir); filter and save on this thread as each finishes
+        workers = max(1, min(8, len(states_to_process)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self._fetch_state_notices, state): state
+                for state in states_to_process
+            }
             
-            try:
-                notices = self._fetch_state_notices(state)
+            for future in as_completed(futures):
+                state = futures[future]
+                logger.info(f"\n📍 Processing: {state}")
                 
-                if notices is not None and not notices.empty:
-                    # Filter for industrial
-                    industrial = self._filter_industrial(notices)
-                    logger.info(f"   ✅ Found {len(industrial)} industrial notices")
-                    
-                    # Save to database
-                    self._save_notices(industrial, state)
-                    
-                    all_notices.append(industrial)
-                else:
-                    logger.info(f"   ⚠️ No notices found or scraper unavailable")
+                try:
+                    notices = future.result()
+                    fetched_any = fetched_any or notices is not None
                     
-            except Exception as e:
-                logger.error(f"   ❌ Error processing {state}: {e}")
-                continue
+                    if notices is not None and not notices.empty:
+                        # Filter for industrial
+                        industrial = self._filter_industrial(notices)
+                        logger.info(f"   ✅ Found {len(industrial)} industrial notices")
+                        
+                        # Save to database
+                        self._save_notices(industrial, state)
+                        
+                        by_state[state] = industrial
+                    else:
+                        logger.info(f"   ⚠️ No notices found or scraper unavailable")
+                        
+                except Exception as e:
+                    logger.error(f"   ❌ Error processing {state}: {e}")
+                    continue
         
-        # Combine results
+        # Combine results (in state order, not completion order)
+        all_notices = [by_state[state] for state in states_to_process if state in by_state]
         if all_notices:
             result = pd.concat(all_notices, ignore_index=True)
+            # A handful of distinct states over many rows
+            result["source_state"] = result["source_state"].astype("category")
             logger.info(f"\n📊 TOTAL: {len(result)} industrial WARN notices")
+            self._write_snapshot(result)
             return result
         
+        if not fetched_any:
+            # Every source failed - the last good run is better than nothing
+            # (notices announce layoffs up to 60 days out)
+            try:
+                snapshot = load_warn_snapshot()
+            except Exception as e:
+                logger.warning(f"Couldn't read WARN snapshot: {e}")
+                snapshot = None
+            if snapshot is not None and not snapshot.empty:
+                logger.warning(f"No WARN source reachable, using last snapshot ({len(snapshot)} notices)")
+                return snapshot
+        
         logger.warning("No WARN notices collected")
         return pd.DataFrame()
     
+    @staticmethod
+    def _write_snapshot(result: pd.DataFrame):
+        """
+        Persist the run's notices as Parquet for load_warn_snapshot(), then
+        drop all but the newest WARN_SNAPSHOT_KEEP snapshots.
+        """
+        if not ARROW_STRINGS:
+            logger.debug("pyarrow not installed, skipping WARN snapshot")
+            return
+        
+        path = WARN_SNAPSHOT_DIR / f"warn_{datetime.now():%Y%m%d}.parquet"
+        try:
+            WARN_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+            # Mixed-type object columns (e.g. raw dates) can't go to Arrow as-is
+            result.astype({
+                col: STRING_DTYPE for col in result.select_dtypes(include="object").columns
+            }).to_parquet(path, compression="zstd", index=False)
+            logger.info(f"   📦 Wrote snapshot {path.name}")
+            
+            snapshots = sorted(WARN_SNAPSHOT_DIR.glob("warn_*.parquet"))
+            for stale in snapshots[:-WARN_SNAPSHOT_KEEP]:
+                stale.unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Couldn't write WARN snapshot: {e}")
+    
     def _fetch_state_notices(self, state: str) -> Optional[pd.DataFrame]:
         """
         Fetch WARN notices for a specific state.
@@ -126,21 +410,13 @@ class WARNPipeline:
         Returns:
             DataFrame of notices or None
         """
+        scraper = (self._scrapers or {}).get(state)
+        if scraper is None:
+            return self._fallback_fetch(state)
+        
         try:
-            # Import warn-scraper
-            from warn import scrapers
-            
-            # Get the scraper for this state
-            scraper_name = state.lower()
-            
-            if not hasattr(scrapers, scraper_name):
-                logger.warning(f"No scraper available for {state}")
-                return None
-            
-            scraper = getattr(scrapers, scraper_name)
-            
-            # Create temp directory for output
-            with tempfile.TemporaryDirectory() as temp_dir:
+            # Create temp directory for output (in memory when available)
+            with tempfile.TemporaryDirectory(dir=SCRAPER_SCRATCH_DIR) as temp_dir:
                 # Run the scraper
                 logger.info(f"   Running {state} scraper...")
                 scraper.scrape(temp_dir)
@@ -149,7 +425,7 @@ class WARNPipeline:
                 csv_path = Path(temp_dir) / f"{state.lower()}.csv"
                 
                 if csv_path.exists():
-                    df = pd.read_csv(csv_path)
+                    df = read_warn_csv(csv_path)
                     df["source_state"] = state
                     
                     # Filter by date
@@ -160,10 +436,6 @@ class WARNPipeline:
                     logger.warning(f"No output file from {state} scraper")
                     return None
                     
-        except ImportError:
-            logger.error("warn-scraper not installed. Run: pip install warn-scraper")
-            return self._fallback_fetch(state)
-            
         except Exception as e:
             logger.error(f"Scraper error for {state}: {e}")
             return self._fallback_fetch(state)
@@ -180,7 +452,7 @@ class WARNPipeline:
             DataFrame or None
         """
         # For Texas, we can try the TWC API directly
-        if state == "TX":
+        if state in DIRECT_FETCH_STATES:
             return self._fetch_texas_direct()
         
         return None
@@ -189,29 +461,27 @@ class WARNPipeline:
         """
         Fetch Texas WARN notices directly from TWC.
         Texas publishes a relatively clean Excel file.
-        """
-        import requests
-        
-        url = "https://www.twc.texas.gov/files/news/warn-act-listings-702.xlsx"
         
+        The workbook is streamed to disk and re-downloaded only when TWC's
+        ETag/Last-Modified says it changed (conditional GET).
+        """
         try:
             logger.info("   Trying direct Texas WARN fetch...")
             
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            workbook = self._download_texas_workbook()
             
-            # Read Excel directly from bytes
-            df = pd.read_excel(response.content)
+            # Only the columns we map; openpyxl reads the sheet read-only
+            df = pd.read_excel(
+                workbook,
+                engine="openpyxl",
+                usecols=lambda col: col in TEXAS_COLUMNS,
+                dtype={"ZIP_CODE": STRING_DTYPE}
+            )
+            df = to_string_columns(df)
             df["source_state"] = "TX"
             
             # Standardize column names
-            df = df.rename(columns={
-                "JOB_SITE_NAME": "company_name",
-                "NOTICE_DATE": "notice_date",
-                "TOTAL_LAYOFF_NUMBER": "affected_count",
-                "CITY_NAME": "city",
-                "ZIP_CODE": "zip_code"
-            })
+            df = df.rename(columns=TEXAS_COLUMNS)
             
             # Filter by date
             df = self._filter_by_date(df)
@@ -223,29 +493,68 @@ class WARNPipeline:
             logger.error(f"Direct Texas fetch failed: {e}")
             return None
     
+    def _download_texas_workbook(self) -> Path:
+        """
+        Download the TWC workbook unless the cached copy is still current.
+        
+        Returns:
+            Path to the local workbook
+        """
+        TEXAS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        workbook = TEXAS_CACHE_DIR / "warn-act-listings.xlsx"
+        meta_path = TEXAS_CACHE_DIR / "warn-act-listings.json"
+        
+        headers = {}
+        if workbook.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        
+        with self.session.get(TEXAS_WARN_URL, headers=headers, stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                logger.info("   Texas workbook unchanged, using cached copy")
+                return workbook
+            
+            response.raise_for_status()
+            
+            # Stream to a temp file, then swap in - never a half-written cache
+            partial = workbook.with_suffix(".part")
+            with open(partial, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+            partial.replace(workbook)
+            
+            meta_path.write_text(json.dumps({
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }))
+        
+        return workbook
+    
     def _filter_by_date(self, df: pd.DataFrame) -> pd.DataFrame:
         """Filter notices to recent timeframe."""
         if df.empty:
             return df
         
         # Find the date column
-        date_col = None
-        for col in ["notice_date", "NOTICE_DATE", "date", "Date"]:
-            if col in df.columns:
-                date_col = col
-                break
+        date_col = find_col(df, DATE_COLUMNS)
         
         if not date_col:
             return df
         
-        # Convert to datetime
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+        # Convert the whole column at once: the format is inferred from the
+        # first value and applied in C, and cache=True parses each distinct
+        # date string only once (notices cluster on a few dates). Already
+        # parsed, _save_notices' conversion of this column is a no-op
+        df[date_col] = pd.to_datetime(df[date_col], errors="coerce", cache=True)
         
         # Filter to lookback period
         cutoff = datetime.now() - timedelta(days=self.lookback_days)
         mask = df[date_col] >= cutoff
         
-        return df[mask].copy()
+        return _apply_mask(df, mask.to_numpy(dtype=bool))
     
     def _filter_industrial(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -261,113 +570,106 @@ class WARNPipeline:
             return df
         
         # Find company name column
-        name_col = None
-        for col in ["company_name", "JOB_SITE_NAME", "EMPLOYER_NAME", "Company"]:
-            if col in df.columns:
-                name_col = col
-                break
+        name_col = find_col(df, NAME_COLUMNS)
         
         if not name_col:
             logger.warning("No company name column found")
             return df
         
-        # Filter using pattern
-        mask = df[name_col].fillna("").str.contains(
-            self.industrial_pattern,
-            regex=True
-        )
-        
-        # Also include based on job type if available
-        if "layoff_type" in df.columns or "LAYOFF_TYPE" in df.columns:
-            type_col = "layoff_type" if "layoff_type" in df.columns else "LAYOFF_TYPE"
-            mask = mask | df[type_col].fillna("").str.contains(
-                self.industrial_pattern,
-                regex=True
+        # Also include based on job type if available - one regex pass over
+        # "name\ntype" rather than two (no keyword spans a newline)
+        haystack = df[name_col]
+        type_col = find_col(df, ["layoff_type", "LAYOFF_TYPE"])
+        if type_col:
+            haystack = haystack.astype(STRING_DTYPE).str.cat(
+                df[type_col].astype(STRING_DTYPE), sep="\n", na_rep=""
             )
         
-        filtered = df[mask].copy()
-        filtered["is_industrial"] = True
-        
-        return filtered
+        # Filter using pattern (na=False: missing names don't match). The
+        # pattern goes in as a string so Arrow-backed columns match in RE2
+        # rather than falling back to Python's re per element
+        mask = haystack.astype(STRING_DTYPE).str.contains(
+            self.industrial_pattern.pattern,
+            case=False,
+            regex=True,
+            na=False
+        ).to_numpy(dtype=bool)
+        
+        return _apply_mask(df, mask).assign(is_industrial=True)
     
     def _save_notices(self, df: pd.DataFrame, state: str):
         """Save WARN notices to database."""
         if df.empty:
             return
         
-        saved_count = 0
+        # Map columns (they vary by state), then coerce a column at a time
+        notices = canonicalize(df)
         
-        for _, row in df.iterrows():
-            try:
-                # Map columns (they vary by state)
-                notice_data = {
-                    "source_state": state,
-                    "company_name": str(row.get("company_name", row.get("JOB_SITE_NAME", ""))),
-                    "notice_date": self._extract_date(row, ["notice_date", "NOTICE_DATE"]),
-                    "effective_date": self._extract_date(row, ["effective_date", "LAYOFF_DATE"]),
-                    "affected_count": self._extract_int(row, ["affected_count", "TOTAL_LAYOFF_NUMBER"]),
-                    "city": str(row.get("city", row.get("CITY_NAME", ""))),
-                    "zip_code": str(row.get("zip_code", row.get("ZIP_CODE", ""))),
-                    "is_industrial": True
-                }
-                
-                # Determine layoff type
-                notice_data["layoff_type"] = self._classify_layoff_type(row)
-                
-                db.save_warn_notice(notice_data)
-                saved_count += 1
-                
-            except Exception as e:
-                logger.debug(f"Error saving notice: {e}")
-                continue
+        for col in ["notice_date", "effective_date"]:
+            notices[col] = pd.to_datetime(
+                notices[col], errors="coerce", format="mixed"
+            ).dt.strftime("%Y-%m-%d")
         
-        logger.info(f"   💾 Saved {saved_count} notices to database")
-    
-    @staticmethod
-    def _extract_date(row: pd.Series, possible_cols: List[str]) -> Optional[str]:
-        """Extract date from various possible columns."""
-        for col in possible_cols:
-            if col in row.index and pd.notna(row[col]):
-                try:
-                    dt = pd.to_datetime(row[col])
-                    return dt.date().isoformat()
-                except:
-                    continue
-        return None
-    
-    @staticmethod
-    def _extract_int(row: pd.Series, possible_cols: List[str]) -> Optional[int]:
-        """Extract integer from various possible columns."""
-        for col in possible_cols:
-            if col in row.index and pd.notna(row[col]):
-                try:
-                    return int(float(row[col]))
-                except:
-                    continue
-        return None
+        # Layoff counts fit easily in 32 bits
+        notices["affected_count"] = np.trunc(notices["affected_count"]).astype("Int32")
+        
+        notices["company_name"] = notices["company_name"].fillna("").astype(str)
+        notices["city"] = notices["city"].fillna("").astype(str)
+        
+        # Zips often arrive as floats from CSV ("75001.0")
+        notices["zip_code"] = (
+            notices["zip_code"].fillna("").astype(str).str.replace(r"\.0$", "", regex=True)
+        )
+        
+        # Determine layoff type for every row at once
+        notices["layoff_type"] = self._classify_layoff_types(df)
+        
+        notices["source_state"] = state
+        notices["is_industrial"] = True
+        
+        # Plain dicts instead of a Series per row; NaN/NA -> None for JSON
+        records = notices.astype(object).where(notices.notna(), None).to_dict("records")
+        
+        # One bulk upsert instead of a round trip per notice
+        try:
+            saved = db.save_warn_notices_bulk(records)
+            logger.info(f"   💾 Saved {saved} notices to database")
+        except Exception as e:
+            logger.error(f"   ❌ Error saving notices: {e}")
     
     @staticmethod
-    def _classify_layoff_type(row: pd.Series) -> str:
-        """Classify the type of WARN notice."""
+    def _classify_layoff_types(df: pd.DataFrame) -> np.ndarray:
+        """
+        Classify the type of every WARN notice in one pass.
+        
+        The free-text columns are joined and lowercased once; each test is
+        then a plain substring scan (no regex) over the whole column.
+        
+        Returns:
+            Array of "closure" / "relocation" / "layoff", one per row
+        """
         # Check various columns for clues
-        text_to_check = " ".join([
-            str(row.get(col, ""))
-            for col in ["company_name", "description", "layoff_type", "LAYOFF_TYPE"]
-            if col in row.index
-        ]).lower()
-        
-        if "clos" in text_to_check:
-            return "closure"
-        elif "reloc" in text_to_check:
-            return "relocation"
-        else:
-            return "layoff"
+        cols = [col for col in LAYOFF_TEXT_COLUMNS if col in df.columns]
+        if not cols:
+            return np.full(len(df), "layoff", dtype=object)
+        
+        parts = [df[col].astype("string").fillna("") for col in cols]
+        text = parts[0].str.cat(parts[1:], sep=" ").str.lower() if len(parts) > 1 else parts[0].str.lower()
+        
+        return np.select(
+            [
+                text.str.contains("clos", regex=False).to_numpy(dtype=bool),
+                text.str.contains("reloc", regex=False).to_numpy(dtype=bool),
+            ],
+            ["closure", "relocation"],
+            default="layoff"
+        )
     
     def calculate_distress_score(
         self, 
-        distance_miles: float, 
-        affected_count: int = 50
-    ) -> float:
+        distance_miles: Union[float, np.ndarray], 
+        affected_count: Union[int, np.ndarray] = 50
+    ) -> Union[float, np.ndarray]:
         """
         Calculate distress signal score based on proximity and magnitude.
         
@@ -375,27 +677,32 @@ class WARNPipeline:
         
         Formula: (1 / (distance + 1)) * magnitude_factor
         
+        Accepts scalars or arrays (broadcast against each other), so a
+        whole set of notices can be scored in one call.
+        
         Args:
-            distance_miles: Distance to the WARN location
-            affected_count: Number of workers affected
+            distance_miles: Distance(s) to the WARN location
+            affected_count: Number(s) of workers affected
             
         Returns:
-            Score from 0-100
+            Score from 0-100 (float for scalar input, else an array)
         """
+        d = np.asarray(distance_miles, dtype=np.float64)
+        a = np.asarray(affected_count, dtype=np.float64)
+        
         # Distance factor: 0 miles = 1.0, 10 miles = 0.09, 50 miles = 0.02
-        distance_factor = 1 / (distance_miles + 1)
+        distance_factor = 1.0 / (d + 1.0)
         
         # Magnitude factor: scale based on affected workers
         # 50 workers = 1.0, 200 workers = 1.5, 500+ workers = 2.0
-        magnitude_factor = min(1 + (affected_count / 200), 2.0)
-        
-        # Calculate raw score (0-2 range)
-        raw_score = distance_factor * magnitude_factor
+        magnitude_factor = np.minimum(1.0 + a / 200.0, 2.0)
         
-        # Scale to 0-100
-        score = raw_score * 50  # Max possible is ~100
+        # Calculate raw score (0-2 range), scale to 0-100
+        score = np.clip(distance_factor * magnitude_factor * 50.0, 0.0, 100.0)
         
-        return min(max(score, 0), 100)
+        if score.ndim == 0:
+            return float(score)
+        return score
     
     def get_nearby_warn_notices(
         self, 
@@ -417,21 +724,18 @@ class WARNPipeline:
         """
         # For MVP, just match first 3 digits of zip (roughly same area)
         prefix = zip_code[:3]
+        if not prefix.isdigit():
+            return []
         
-        notices = db.query(
+        # Prefix match runs in the database (indexed), not on 100 rows here
+        return db.query(
             "raw_warn_notices",
-            filters={"is_industrial": True},
+            columns=NEARBY_NOTICE_COLUMNS,
+            eq_filters={"is_industrial": True},
+            like_filters={"zip_code": f"{prefix}%"},
             order_by="-notice_date",
             limit=100
         )
-        
-        # Filter by zip prefix
-        nearby = [
-            n for n in notices
-            if n.get("zip_code", "").startswith(prefix)
-        ]
-        
-        return nearby
 
 
 # ===========================================
@@ -469,8 +773,9 @@ def main():
         
         # Show score examples
         print("\n📊 DISTRESS SCORES (by distance):")
-        for distance in [0, 5, 10, 25, 50]:
-            score = pipeline.calculate_distress_score(distance, affected_count=100)
+        distances = np.array([0, 5, 10, 25, 50])
+        scores = pipeline.calculate_distress_score(distances, affected_count=100)
+        for distance, score in zip(distances, scores):
             print(f"   {distance} miles away → Score: {score:.1f}")
 
 
@@ -15,9 +15,11 @@ DATA SOURCE: FRED API (free with key)
 import os
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
@@ -27,6 +29,64 @@ from config.settings import settings, FRED_SERIES
 from database.connection import db
 
 
+# FRED publishes at most daily - one cached copy per series per day
+FRED_CACHE_DIR = Path.home() / ".cache" / "propensity" / "fred"
+
+
+# Mock data: the deterministic shapes are built once, only noise is drawn
+MOCK_PERIODS = 24
+_RNG = np.random.default_rng()
+_MOCK_TREND_FREIGHT = np.linspace(0, 0.1, MOCK_PERIODS)
+_MOCK_SEASONAL = 0.05 * np.sin(np.linspace(0, 4 * np.pi, MOCK_PERIODS))
+_MOCK_CYCLE = 50 * np.sin(np.linspace(0, 2 * np.pi, MOCK_PERIODS))
+_MOCK_TREND_EMPLOYMENT = np.linspace(0, 100, MOCK_PERIODS)
+
+
+@lru_cache(maxsize=1)
+def _mock_dates(today: date) -> pd.DatetimeIndex:
+    """Month-end index ending today (rebuilt only when the day changes)."""
+    return pd.date_range(end=today, periods=MOCK_PERIODS, freq='M')
+
+
+TREND_DIRECTIONS = {1: "expanding", -1: "contracting", 0: "stable"}
+
+
+def _mean_valid(window: np.ndarray) -> float:
+    """Mean of the non-NaN values (NaN if there are none), like Series.mean()."""
+    valid = window[~np.isnan(window)]
+    return float(valid.sum() / valid.size) if valid.size else float("nan")
+
+
+def _trend_numeric(v: np.ndarray) -> Tuple[float, float, float, int]:
+    """
+    3-month moving average comparison over the last six values.
+    
+    Missing observations (FRED gaps arrive as NaN) are skipped in each
+    average; if either window has no values at all there's no trend.
+    
+    Returns:
+        (pct_change, current_avg, previous_avg, direction code)
+    """
+    n = v.shape[0]
+    current_avg = _mean_valid(v[n - 3:])
+    previous_avg = _mean_valid(v[n - 6:n - 3])
+    
+    if previous_avg == 0.0 or np.isnan(current_avg) or np.isnan(previous_avg):
+        pct_change = 0.0
+    else:
+        pct_change = (current_avg - previous_avg) / previous_avg
+    
+    # Classify direction
+    if pct_change > 0.05:
+        code = 1
+    elif pct_change < -0.05:
+        code = -1
+    else:
+        code = 0
+    
+    return pct_change, current_avg, previous_avg, code
+
+
 class MacroPipeline:
     """
     Pipeline for collecting and analyzing macro economic indicators.
@@ -40,7 +100,7 @@ class MacroPipeline:
     Usage:
         pipeline = MacroPipeline()
         results = pipeline.run()
-        modifier = pipeline.get_macro_modifier()  # Apply to other scores
+        modifier = pipeline.get_macro_modifier(results)  # Apply to other scores
     """
     
     def __init__(self):
@@ -48,6 +108,10 @@ class MacroPipeline:
         self.api_key = settings.api.fred_api_key
         self.fred = None
         
+        # (series_id, periods) -> Series; run(), get_macro_modifier() and
+        # get_sector_outlook() all ask for the freight series
+        self._series_cache: Dict[Tuple[str, int], pd.Series] = {}
+        
         if self.api_key:
             try:
                 from fredapi import Fred
@@ -70,6 +134,7 @@ class MacroPipeline:
         logger.info("=" * 50)
         
         results = {}
+        indicators = []
         
         for name, series_id in FRED_SERIES.items():
             logger.info(f"\n📊 Fetching: {name} ({series_id})")
@@ -85,8 +150,8 @@ class MacroPipeline:
                     logger.info(f"   ✅ Got {len(data)} observations")
                     logger.info(f"   📈 Trend: {trend['direction']} ({trend['pct_change']:.1%})")
                     
-                    # Save to database
-                    self._save_indicator(series_id, name, data, trend)
+                    # Saved together once every series is in
+                    indicators.append(self._indicator_record(series_id, name, data, trend))
                 else:
                     logger.warning(f"   ⚠️ No data returned")
                     
@@ -94,6 +159,9 @@ class MacroPipeline:
                 logger.error(f"   ❌ Error: {e}")
                 continue
         
+        # Save to database
+        self._save_indicators(indicators)
+        
         return results
     
     def _fetch_series(self, series_id: str, periods: int = 24) -> Optional[pd.Series]:
@@ -107,10 +175,26 @@ class MacroPipeline:
         Returns:
             pandas Series with the data
         """
+        key = (series_id, periods)
+        if key not in self._series_cache:
+            self._series_cache[key] = self._fetch_series_uncached(series_id, periods)
+        return self._series_cache[key]
+    
+    def _fetch_series_uncached(self, series_id: str, periods: int) -> Optional[pd.Series]:
+        """_fetch_series without the in-process memo; uses the disk cache."""
         if self.fred:
+            cache_path = FRED_CACHE_DIR / f"{series_id}_{date.today().isoformat()}.pkl"
+            
+            if cache_path.exists():
+                try:
+                    return pd.read_pickle(cache_path).tail(periods)
+                except Exception as e:
+                    logger.debug(f"Unreadable FRED cache {cache_path.name}: {e}")
+            
             try:
-                # Fetch last N observations
+                # Fetch the full series once; callers slice the last N
                 data = self.fred.get_series(series_id)
+                self._write_cache(series_id, cache_path, data)
                 return data.tail(periods)
                 
             except Exception as e:
@@ -119,44 +203,40 @@ class MacroPipeline:
         else:
             return self._get_mock_data(series_id)
     
+    @staticmethod
+    def _write_cache(series_id: str, cache_path: Path, data: pd.Series):
+        """Store today's copy of a series and drop older days'."""
+        try:
+            FRED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            for stale in FRED_CACHE_DIR.glob(f"{series_id}_*.pkl"):
+                stale.unlink(missing_ok=True)
+            data.to_pickle(cache_path)
+        except OSError as e:
+            logger.debug(f"Couldn't cache FRED series {series_id}: {e}")
+    
     def _get_mock_data(self, series_id: str) -> pd.Series:
         """
         Generate mock data when API is unavailable.
         Used for testing and development.
         """
-        import numpy as np
-        
         logger.info("   Using mock data (API unavailable)")
         
         # Generate 24 months of mock data
-        dates = pd.date_range(
-            end=datetime.now(),
-            periods=24,
-            freq='M'
-        )
+        dates = _mock_dates(date.today())
         
         # Different patterns for different series
-        if "FREIGHT" in series_id.upper():
+        key = series_id.upper()
+        if "FREIGHT" in key:
             # Freight: slight upward trend with seasonality
-            base = 1.1
-            trend = np.linspace(0, 0.1, 24)
-            seasonal = 0.05 * np.sin(np.linspace(0, 4*np.pi, 24))
-            noise = np.random.normal(0, 0.02, 24)
-            values = base + trend + seasonal + noise
+            values = 1.1 + _MOCK_TREND_FREIGHT + _MOCK_SEASONAL + _RNG.normal(0, 0.02, MOCK_PERIODS)
             
-        elif "INV" in series_id.upper():
+        elif "INV" in key:
             # Inventories: cyclical
-            base = 700
-            cycle = 50 * np.sin(np.linspace(0, 2*np.pi, 24))
-            noise = np.random.normal(0, 10, 24)
-            values = base + cycle + noise
+            values = 700 + _MOCK_CYCLE + _RNG.normal(0, 10, MOCK_PERIODS)
             
         else:
             # Employment: steady growth
-            base = 1500
-            trend = np.linspace(0, 100, 24)
-            noise = np.random.normal(0, 10, 24)
-            values = base + trend + noise
+            values = 1500 + _MOCK_TREND_EMPLOYMENT + _RNG.normal(0, 10, MOCK_PERIODS)
         
         return pd.Series(values, index=dates)
     
@@ -170,62 +250,55 @@ class MacroPipeline:
         if len(data) < 6:
             return {"direction": "unknown", "pct_change": 0.0}
         
-        # 3-month moving average comparison
-        current_avg = data.iloc[-3:].mean()
-        previous_avg = data.iloc[-6:-3].mean()
-        
-        if previous_avg == 0:
-            pct_change = 0.0
-        else:
-            pct_change = (current_avg - previous_avg) / previous_avg
-        
-        # Classify direction
-        if pct_change > 0.05:
-            direction = "expanding"
-        elif pct_change < -0.05:
-            direction = "contracting"
-        else:
-            direction = "stable"
+        # Only the last six observations matter - pull them out as floats once
+        pct_change, current_avg, previous_avg, code = _trend_numeric(
+            data.iloc[-6:].to_numpy(dtype=np.float64)
+        )
         
         return {
-            "direction": direction,
+            "direction": TREND_DIRECTIONS[code],
             "pct_change": pct_change,
             "current_value": data.iloc[-1],
             "current_avg": current_avg,
             "previous_avg": previous_avg
         }
     
-    def _save_indicator(
-        self, 
+    @staticmethod
+    def _indicator_record(
         series_id: str, 
         series_name: str, 
         data: pd.Series,
         trend: Dict
-    ):
-        """Save economic indicator to database."""
+    ) -> Dict:
+        """Database row for a series' latest observation."""
+        return {
+            "series_id": series_id,
+            "series_name": series_name,
+            "record_date": data.index[-1].date().isoformat(),
+            "value": float(data.iloc[-1]),
+            "pct_change_mom": trend.get("pct_change", 0),
+            "trend_direction": trend.get("direction", "unknown")
+        }
+    
+    def _save_indicators(self, indicators: List[Dict]):
+        """Save economic indicators to database in one upsert."""
+        if not indicators:
+            return
+        
         try:
-            # Save latest observation
-            record = {
-                "series_id": series_id,
-                "series_name": series_name,
-                "record_date": data.index[-1].date().isoformat(),
-                "value": float(data.iloc[-1]),
-                "pct_change_mom": trend.get("pct_change", 0),
-                "trend_direction": trend.get("direction", "unknown")
-            }
-            
-            db.upsert(
-                "economic_indicators",
-                record,
-                conflict_columns=["series_id", "record_date"]
-            )
-            
-            logger.debug(f"   💾 Saved indicator to database")
+            db.save_indicators_bulk(indicators)
+            logger.debug(f"   💾 Saved {len(indicators)} indicators to database")
             
         except Exception as e:
-            logger.error(f"Error saving indicator: {e}")
+            logger.error(f"Error saving indicators: {e}")
     
-    def get_macro_modifier(self) -> float:
+    def _series(self, name: str, results: Optional[Dict[str, pd.Series]]) -> Optional[pd.Series]:
+        """A series from run()'s results if there, else fetched."""
+        if results and name in results:
+            return results[name]
+        return self._fetch_series(FRED_SERIES[name])
+    
+    def get_macro_modifier(self, results: Optional[Dict[str, pd.Series]] = None) -> float:
         """
         Calculate the overall macro environment modifier.
         
@@ -234,11 +307,14 @@ class MacroPipeline:
         - Stable: 1.0 (no change)
         - Contraction: 0.9 (reduce scores by 10%)
         
+        Args:
+            results: Output of run(), to reuse instead of fetching again
+        
         Returns:
             Multiplier between 0.8 and 1.2
         """
         # Fetch the key freight indicator
-        freight_data = self._fetch_series(FRED_SERIES["freight_shipments"])
+        freight_data = self._series("freight_shipments", results)
         
         if freight_data is None or len(freight_data) < 6:
             logger.warning("Insufficient data for macro modifier, using 1.0")
@@ -263,18 +339,20 @@ class MacroPipeline:
         
         return modifier
     
-    def get_sector_outlook(self) -> Dict[str, str]:
+    def get_sector_outlook(self, results: Optional[Dict[str, pd.Series]] = None) -> Dict[str, str]:
         """
         Get outlook for different sectors based on indicators.
         
+        Args:
+            results: Output of run(), to reuse instead of fetching again
+        
         Returns:
             Dict mapping sector to outlook (bullish/neutral/bearish)
         """
         outlook = {}
         
-        # Warehouse outlook from freight + warehouse employment
-        freight = self._fetch_series(FRED_SERIES["freight_shipments"])
-        warehouse_emp = self._fetch_series(FRED_SERIES.get("warehouse_employment", ""))
+        # Warehouse outlook from freight
+        freight = self._series("freight_shipments", results)
         
         if freight is not None:
             freight_trend = self._calculate_trend(freight)
@@ -286,7 +364,7 @@ class MacroPipeline:
                 outlook["warehouse"] = "neutral"
         
         # Manufacturing outlook
-        inventory = self._fetch_series(FRED_SERIES["manufacturing_inventory"])
+        inventory = self._series("manufacturing_inventory", results)
         
         if inventory is not None:
             inv_trend = self._calculate_trend(inventory)
@@ -328,12 +406,12 @@ def main():
     print("📊 ECONOMIC ENVIRONMENT ANALYSIS")
     print("=" * 60)
     
-    modifier = pipeline.get_macro_modifier()
+    modifier = pipeline.get_macro_modifier(results)
     print(f"\n🎯 Macro Modifier: {modifier}")
     print(f"   (Apply this to all propensity scores)")
     
     # Show sector outlook
-    outlook = pipeline.get_sector_outlook()
+    outlook = pipeline.get_sector_outlook(results)
     print("\n📈 Sector Outlook:")
     for sector, status in outlook.items():
         emoji = "🟢" if status == "bullish" else "🟡" if status == "neutral" else "🔴"
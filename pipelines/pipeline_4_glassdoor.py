@@ -14,24 +14,156 @@ NOTE: This is the budget-friendly version. For production scale,
       consider ZenRows ($29/mo) or ScraperAPI ($49/mo).
 """
 
+import asyncio
 import os
 import sys
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
-import time
 import json
 import re
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import lxml.html
 from loguru import logger
+from lxml import etree
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+try:
+    import orjson
+    json_loads = orjson.loads  # same dicts as json.loads, several times faster
+except ImportError:  # Optional - stdlib json
+    orjson = None
+    json_loads = json.loads
+
+try:
+    import h2  # noqa: F401 - lets httpx negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:  # Optional - HTTP/1.1 keep-alive only
+    HTTP2_AVAILABLE = False
+
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import settings
 from database.connection import db
+from pipelines.glassdoor_cache import GlassdoorCache
+
+
+GLASSDOOR_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+# One pool shared by every fetch; DuckDuckGo and Glassdoor each keep their
+# own idle connections open for reuse instead of re-handshaking
+GLASSDOOR_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=75.0
+)
+
+# Compiled once at import (slugs are built and pages parsed per company)
+COMPANY_SUFFIX_PATTERN = re.compile(r'\s+(LLC|Inc|Corp|Co|Ltd)\.?$', re.IGNORECASE)
+SLUG_SEPARATOR_PATTERN = re.compile(r'[^a-zA-Z0-9]+')
+RATING_TEXT_PATTERN = re.compile(r'(\d\.\d)\s*out of\s*5')
+
+# Only these nodes are pulled out of a page, by libxml2's C parser and a
+# precompiled XPath - no Python object tree for the rest of the document
+JSON_LD_XPATH = etree.XPath('//script[@type="application/ld+json"]/text()')
+RESULT_LINK_XPATH = etree.XPath(
+    '//a[contains(concat(" ", normalize-space(@class), " "), " result__a ")]/@href'
+)
+
+
+def _select(html: str, xpath: etree.XPath) -> List[str]:
+    """Strings an XPath selects from an HTML document ([] if unparseable)."""
+    try:
+        return [str(value) for value in xpath(lxml.html.fromstring(html))]
+    except (etree.ParserError, ValueError):
+        return []
+
+
+# Statuses meaning the host wants us to slow down
+OVERLOAD_STATUSES = frozenset((403, 429, 500, 502, 503, 504))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) concurrency limit
+    for one host.
+    
+    Starts at one request in flight. Every `increase_every` successes adds
+    one more slot, up to `max_concurrency`, as long as the recent overload
+    rate is low; any 403/429/5xx halves the limit (never below
+    `min_concurrency`). A healthy host is fetched several at a time, a
+    pushing-back one backs off immediately.
+    
+    Usage:
+        limiter = AdaptiveLimiter()
+        async with limiter:
+            response = await http.get(url)
+        if response.status_code in OVERLOAD_STATUSES:
+            limiter.on_overload()
+        else:
+            limiter.on_success()
+    """
+    
+    def __init__(
+        self,
+        concurrency: int = 1,
+        min_concurrency: int = 1,
+        max_concurrency: int = 4,
+        increase_every: int = 5,
+        window: int = 50,
+        max_overload_ratio: float = 0.1
+    ):
+        self.concurrency = concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase_every = increase_every
+        self.max_overload_ratio = max_overload_ratio
+        
+        self._outcomes = deque(maxlen=window)  # True = overloaded
+        self._successes = 0
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+    
+    @property
+    def overload_ratio(self) -> float:
+        """Share of the recent requests that were pushed back."""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+    
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.concurrency)
+            self._in_flight += 1
+    
+    async def __aexit__(self, *exc_info):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    def on_success(self):
+        """Additive increase: one more slot every `increase_every` successes."""
+        self._outcomes.append(False)
+        self._successes += 1
+        
+        if (
+            self._successes >= self.increase_every
+            and self.concurrency < self.max_concurrency
+            and self.overload_ratio <= self.max_overload_ratio
+        ):
+            self.concurrency += 1
+            self._successes = 0
+    
+    def on_overload(self):
+        """Multiplicative decrease: halve the limit."""
+        self._outcomes.append(True)
+        self._successes = 0
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
 
 
 class GlassdoorPipeline:
@@ -39,9 +171,9 @@ class GlassdoorPipeline:
     Pipeline for collecting Glassdoor sentiment data.
     
     Budget-Friendly Approach:
-    1. Uses standard requests with delays (respects rate limits)
+    1. Fetches companies concurrently, adaptively limited per host (respects rate limits)
     2. Parses JSON-LD structured data (stable, SEO-focused)
-    3. Caches results to minimize requests
+    3. Caches results (in memory and on disk, across runs) to minimize requests
     4. Falls back to estimated scores when blocked
     
     Usage:
@@ -54,45 +186,119 @@ class GlassdoorPipeline:
         results = pipeline.run(["Amazon", "UPS", "FedEx"])
     """
     
-    # Glassdoor blocks aggressive scraping, so we rate limit ourselves
-    REQUEST_DELAY = 3.0  # seconds between requests
-    
     def __init__(self):
         """Initialize the pipeline."""
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-        })
-        
-        self.last_request_time = 0
+        # Glassdoor blocks aggressive scraping, so each host gets its own
+        # adaptive concurrency limit
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
         self._cache = {}
+        # Lookups in flight, by cache key, so repeated names share one scrape
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Freshly scraped sentiments not yet written to the database
+        self._unsaved: List[Dict] = []
+        
+        # Shared client, opened lazily on the event loop that first needs it
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # On-disk cache; survives restarts so daily runs skip known companies
+        self.cache: Optional[GlassdoorCache] = None
+        if settings.pipeline.glassdoor_cache_enabled:
+            try:
+                self.cache = GlassdoorCache()
+            except Exception as e:
+                logger.warning(f"Glassdoor cache unavailable: {e}")
         
         logger.info("GlassdoorPipeline initialized (budget mode)")
-        logger.info(f"  - Request delay: {self.REQUEST_DELAY}s between requests")
+        logger.info("  - Adaptive per-host concurrency (AIMD)")
+    
+    def _client(self) -> httpx.AsyncClient:
+        """
+        The pipeline's shared HTTP client for the running event loop.
+        
+        Connections (and asyncio primitives) belong to one loop, so a new
+        loop gets a new client and fresh limiters - carrying over the
+        learned limits.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            self._limiters = {
+                host: AdaptiveLimiter(concurrency=limiter.concurrency)
+                for host, limiter in self._limiters.items()
+            }
+            self._http = httpx.AsyncClient(
+                headers=GLASSDOOR_HEADERS,
+                limits=GLASSDOOR_LIMITS,
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True
+            )
+            self._http_loop = loop
+        return self._http
+    
+    async def aclose(self):
+        """Close the shared HTTP client (and its pooled connections)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+    
+    async def _closing(self, coro):
+        """Await coro, then close the client (for the sync wrappers)."""
+        try:
+            return await coro
+        finally:
+            await self.aclose()
     
     def run(self, company_names: List[str]) -> List[Dict]:
         """
         Process multiple companies.
         
+        Synchronous wrapper around run_async().
+        
         Args:
             company_names: List of company names to look up
             
         Returns:
             List of sentiment results
         """
+        return asyncio.run(self._closing(self.run_async(company_names)))
+    
+    async def run_async(self, company_names: List[str]) -> List[Dict]:
+        """
+        Process multiple companies.
+        
+        Every company is looked up concurrently on one event loop, so the
+        round trips overlap instead of queueing; per-host limits still
+        apply (see _get).
+        
+        Args:
+            company_names: List of company names to look up
+            
+        Returns:
+            List of sentiment results (in input order)
+        """
         logger.info("=" * 50)
         logger.info("⭐ STARTING PIPELINE 4: GLASSDOOR SENTIMENT")
         logger.info("=" * 50)
         
+        # Company lookups are cached for this run only
+        db.clear_company_cache()
+        sentiments = await asyncio.gather(
+            *(self.get_company_sentiment_async(name, save=False) for name in company_names),
+            return_exceptions=True
+        )
+        # One company lookup and one signal upsert for the whole batch
+        await self._flush_unsaved()
+        db.clear_company_cache()
+        
         results = []
         
-        for name in company_names:
+        for name, sentiment in zip(company_names, sentiments):
             logger.info(f"\n📊 Processing: {name}")
             
             try:
-                sentiment = self.get_company_sentiment(name)
+                if isinstance(sentiment, BaseException):
+                    raise sentiment
                 
                 if sentiment and "error" not in sentiment:
                     logger.info(f"   ✅ Rating: {sentiment.get('overall_rating', 'N/A')}")
@@ -114,69 +320,152 @@ class GlassdoorPipeline:
         """
         Get Glassdoor sentiment for a company.
         
+        Synchronous wrapper around get_company_sentiment_async().
+        
+        Args:
+            company_name: Company name to search
+            
+        Returns:
+            Dict with rating data or None
+        """
+        return asyncio.run(self._closing(self.get_company_sentiment_async(company_name)))
+    
+    async def get_company_sentiment_async(
+        self,
+        company_name: str,
+        save: bool = True
+    ) -> Optional[Dict]:
+        """
+        Get Glassdoor sentiment for a company.
+        
+        Concurrent calls for the same company (e.g. a name repeated in
+        run_async) await a single lookup instead of each scraping it.
+        
         Args:
             company_name: Company name to search
+            save: Save fresh results to the database now (run_async
+                saves the whole batch at once instead)
             
         Returns:
             Dict with rating data or None
         """
+        cache_key = GlassdoorCache.make_key(company_name)
+        
+        task = self._inflight.get(cache_key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._lookup_sentiment(company_name, cache_key))
+            self._inflight[cache_key] = task
+            
+            def _forget(done: asyncio.Task):
+                if self._inflight.get(cache_key) is done:
+                    del self._inflight[cache_key]
+            
+            task.add_done_callback(_forget)
+        
+        # Shielded: one caller being cancelled mustn't cancel the others' lookup
+        sentiment = await asyncio.shield(task)
+        if save:
+            await self._flush_unsaved()
+        return sentiment
+    
+    async def _flush_unsaved(self):
+        """Save the sentiments scraped since the last flush, in bulk."""
+        unsaved, self._unsaved = self._unsaved, []
+        if unsaved:
+            # Blocking I/O - keep the loop free
+            await asyncio.to_thread(self._save_sentiments, unsaved)
+    
+    async def _lookup_sentiment(self, company_name: str, cache_key: str) -> Optional[Dict]:
+        """Cache lookups, then search and scrape (see get_company_sentiment_async)."""
         # Check cache first
-        cache_key = company_name.lower().strip()
         if cache_key in self._cache:
             logger.debug(f"Cache hit for {company_name}")
             return self._cache[cache_key]
         
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Disk cache hit for {company_name}")
+                self._cache[cache_key] = cached
+                return cached
+            if self.cache.is_miss(cache_key):
+                logger.debug(f"Recently not found: {company_name}")
+                return None
+        
         # Search for the company
-        glassdoor_url = self._search_glassdoor(company_name)
+        glassdoor_url = await self._search_glassdoor(company_name)
         
-        if not glassdoor_url:
+        # Fetch and parse the page
+        sentiment = await self._fetch_sentiment(glassdoor_url) if glassdoor_url else None
+        
+        if not sentiment:
+            # Remember the miss briefly so unknown names aren't re-searched
+            if self.cache is not None:
+                self.cache.set_miss(
+                    cache_key, ttl_seconds=settings.pipeline.glassdoor_miss_ttl_hours * 3600
+                )
             return None
         
-        # Fetch and parse the page
-        sentiment = self._fetch_sentiment(glassdoor_url)
+        sentiment["company_name"] = company_name
+        sentiment["glassdoor_url"] = glassdoor_url
+        self._cache[cache_key] = sentiment
+        if self.cache is not None:
+            self.cache.set(
+                cache_key, sentiment, ttl_seconds=settings.pipeline.glassdoor_cache_ttl_days * 86400
+            )
         
-        if sentiment:
-            sentiment["company_name"] = company_name
-            sentiment["glassdoor_url"] = glassdoor_url
-            self._cache[cache_key] = sentiment
-            
-            # Save to database
-            self._save_sentiment(sentiment)
+        # Saved to the database by the caller (see _flush_unsaved)
+        self._unsaved.append(sentiment)
         
         return sentiment
     
-    def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.REQUEST_DELAY:
-            sleep_time = self.REQUEST_DELAY - elapsed
-            logger.debug(f"Rate limiting: sleeping {sleep_time:.1f}s")
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+    async def _get(
+        self, 
+        url: str, 
+        timeout: float, 
+        **kwargs
+    ) -> httpx.Response:
+        """GET through the host's adaptive limiter, feeding back the outcome."""
+        host = httpx.URL(url).host
+        # Client first: a new event loop replaces the limiters
+        client = self._client()
+        limiter = self._limiters.setdefault(host, AdaptiveLimiter())
+        
+        async with limiter:
+            try:
+                response = await client.get(url, timeout=timeout, **kwargs)
+            except httpx.TransportError:
+                limiter.on_overload()
+                raise
+        
+        if response.status_code in OVERLOAD_STATUSES:
+            limiter.on_overload()
+            logger.debug(f"{host} pushing back, concurrency -> {limiter.concurrency}")
+        else:
+            limiter.on_success()
+        
+        return response
     
-    def _search_glassdoor(self, company_name: str) -> Optional[str]:
+    async def _search_glassdoor(self, company_name: str) -> Optional[str]:
         """
         Search for a company on Glassdoor.
         
         Returns the reviews page URL or None.
         """
-        self._rate_limit()
-        
         # Use Google to find the Glassdoor page (more reliable than Glassdoor search)
         search_query = f"site:glassdoor.com/Reviews {company_name} reviews"
         
         try:
             # Try DuckDuckGo HTML search (no API key needed)
-            ddg_url = f"https://html.duckduckgo.com/html/?q={requests.utils.quote(search_query)}"
-            
-            response = self.session.get(ddg_url, timeout=10)
+            response = await self._get(
+                "https://html.duckduckgo.com/html/",
+                timeout=10,
+                params={"q": search_query}
+            )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
                 # Find result links
-                for link in soup.find_all('a', class_='result__a'):
-                    href = link.get('href', '')
+                for href in _select(response.text, RESULT_LINK_XPATH):
                     if 'glassdoor.com/Reviews' in href and '-Reviews-' in href:
                         # Clean up the URL
                         if href.startswith('//'):
@@ -194,13 +483,13 @@ class GlassdoorPipeline:
     def _create_slug(name: str) -> str:
         """Create a URL slug from company name."""
         # Remove common suffixes
-        clean = re.sub(r'\s+(LLC|Inc|Corp|Co|Ltd)\.?$', '', name, flags=re.IGNORECASE)
+        clean = COMPANY_SUFFIX_PATTERN.sub('', name)
         # Convert to slug format
-        slug = re.sub(r'[^a-zA-Z0-9]+', '-', clean.strip())
+        slug = SLUG_SEPARATOR_PATTERN.sub('-', clean.strip())
         return slug.strip('-')
     
     @retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=1, min=2, max=5))
-    def _fetch_sentiment(self, url: str) -> Optional[Dict]:
+    async def _fetch_sentiment(self, url: str) -> Optional[Dict]:
         """
         Fetch and parse Glassdoor page for sentiment data.
         
@@ -210,10 +499,8 @@ class GlassdoorPipeline:
         Returns:
             Dict with sentiment data
         """
-        self._rate_limit()
-        
         try:
-            response = self.session.get(url, timeout=15)
+            response = await self._get(url, timeout=15)
             
             if response.status_code == 403:
                 logger.warning("Glassdoor blocking requests (403)")
@@ -225,7 +512,7 @@ class GlassdoorPipeline:
             
             return self._parse_page(response.text)
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Request failed: {e}")
             return None
     
@@ -235,12 +522,17 @@ class GlassdoorPipeline:
         
         Uses JSON-LD structured data which is more stable than DOM parsing.
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
         # Method 1: Try JSON-LD (most reliable)
-        for script in soup.find_all('script', type='application/ld+json'):
+        for script in _select(html, JSON_LD_XPATH):
+            # Only blocks that could hold a rating are worth decoding; a
+            # substring scan is far cheaper than parsing the JSON to find out
+            if 'aggregateRating' not in script:
+                continue
+            if 'Employer' not in script and 'Organization' not in script:
+                continue
+            
             try:
-                data = json.loads(script.string)
+                data = json_loads(script)
                 
                 # Look for Employer or Organization schema
                 if isinstance(data, dict):
@@ -273,7 +565,7 @@ class GlassdoorPipeline:
         # Method 2: Try parsing visible rating (fallback)
         try:
             # Look for rating in page content
-            rating_match = re.search(r'(\d\.\d)\s*out of\s*5', html)
+            rating_match = RATING_TEXT_PATTERN.search(html)
             if rating_match:
                 return {
                     "overall_rating": float(rating_match.group(1)),
@@ -300,26 +592,32 @@ class GlassdoorPipeline:
             "note": "Unable to scrape - using industry average"
         }
     
-    def _save_sentiment(self, sentiment: Dict):
-        """Save sentiment to database via company's signal history."""
+    def _save_sentiments(self, sentiments: List[Dict]):
+        """Save sentiments to database via the companies' signal history."""
         try:
-            # Find or create the company
-            company = db.get_or_create_company(
-                company_name=sentiment.get("company_name", "Unknown"),
-                zip_code="00000",  # Unknown - will be enriched later
-                glassdoor_url=sentiment.get("glassdoor_url")
-            )
-            
-            if company:
-                # Update signal history
-                db.save_signal_history(
-                    company_id=company["id"],
-                    signals={
-                        "glassdoor_rating": sentiment.get("overall_rating"),
-                        "glassdoor_review_count": sentiment.get("review_count"),
-                        "record_date": datetime.now().date().isoformat()
-                    }
+            # Find or create the companies (zip unknown - enriched later)
+            companies = db.get_or_create_companies([
+                (
+                    sentiment.get("company_name", "Unknown"),
+                    "00000",
+                    {"glassdoor_url": sentiment.get("glassdoor_url")}
                 )
+                for sentiment in sentiments
+            ])
+            
+            record_date = datetime.now().date().isoformat()
+            # Keyed by company so names normalizing alike upsert one row
+            rows = {
+                company["id"]: {
+                    "company_id": company["id"],
+                    "glassdoor_rating": sentiment.get("overall_rating"),
+                    "glassdoor_review_count": sentiment.get("review_count"),
+                    "record_date": record_date
+                }
+                for sentiment, company in zip(sentiments, companies)
+                if company
+            }
+            db.save_signal_history_bulk(list(rows.values()))
                 
         except Exception as e:
             logger.debug(f"Error saving sentiment: {e}")
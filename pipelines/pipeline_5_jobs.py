@@ -237,76 +237,69 @@ class JobPipeline:
         if not title_col:
             return df
         
-        # Filter using pattern
-        mask = df[title_col].fillna("").str.contains(
-            self.title_pattern,
-            regex=True
-        )
-        
-        filtered = df[mask].copy()
-        filtered["is_industrial"] = True
+        # Boards repeat the same few titles ("Warehouse Associate", ...), so
+        # the pattern only runs over the distinct ones; rows are then
+        # matched by a hash lookup (isin) instead of a regex scan each
+        titles = df[title_col].fillna("").astype(str).str.lower()
+        unique_titles = titles.drop_duplicates()
+        industrial_titles = unique_titles[
+            unique_titles.str.contains(self.title_pattern, regex=True)
+        ]
+        mask = titles.isin(industrial_titles)
         
-        return filtered
+        # Boolean indexing already yields a new frame; no extra .copy()
+        return df.loc[mask].assign(is_industrial=True)
     
     def _save_jobs(self, df: pd.DataFrame):
         """Save jobs to database."""
         if df.empty:
             return
         
-        saved_count = 0
-        
-        for _, row in df.iterrows():
-            try:
-                job_data = {
-                    "company_name": str(row.get("company", row.get("company_name", ""))),
-                    "job_title": str(row.get("title", row.get("job_title", ""))),
-                    "city": self._extract_city(row.get("location", "")),
-                    "state": self.target_state,
-                    "source_board": str(row.get("site", "unknown")),
-                    "job_url": str(row.get("job_url", "")),
-                    "posted_date": self._extract_date(row.get("date_posted")),
-                    "is_industrial": True
-                }
-                
-                # Use upsert to avoid duplicates
-                db.upsert(
-                    "raw_job_postings",
-                    job_data,
-                    conflict_columns=["job_url"]
-                )
-                saved_count += 1
-                
-            except Exception as e:
-                logger.debug(f"Error saving job: {e}")
-                continue
-        
-        logger.info(f"   💾 Saved {saved_count} jobs to database")
+        # Build the rows a column at a time (JobSpy and the mock data name
+        # some columns differently)
+        jobs = pd.DataFrame({
+            "company_name": self._first_column(df, ["company", "company_name"]).astype(str),
+            "job_title": self._first_column(df, ["title", "job_title"]).astype(str),
+            "city": self._extract_cities(self._first_column(df, ["location"])),
+            "source_board": self._first_column(df, ["site"], "unknown").astype(str),
+            "job_url": self._first_column(df, ["job_url"]).astype(str),
+            "posted_date": self._extract_dates(self._first_column(df, ["date_posted"], None)),
+        }, index=df.index)
+        jobs["state"] = self.target_state
+        jobs["is_industrial"] = True
+        
+        # One bulk upsert (on job_url, to avoid duplicates) instead of a
+        # round trip per job
+        try:
+            saved = db.save_job_postings_bulk(jobs.to_dict("records"))
+            logger.info(f"   💾 Saved {saved} jobs to database")
+        except Exception as e:
+            logger.error(f"   ❌ Error saving jobs: {e}")
+    
+    @staticmethod
+    def _first_column(df: pd.DataFrame, candidates: List[str], default="") -> pd.Series:
+        """The first candidate column present (gaps filled), else all default."""
+        for col in candidates:
+            if col in df.columns:
+                return df[col].where(df[col].notna(), default)
+        return pd.Series(default, index=df.index, dtype=object)
     
     @staticmethod
-    def _extract_city(location: str) -> str:
-        """Extract city from location string."""
-        if not location:
-            return ""
+    def _extract_cities(locations: pd.Series) -> pd.Series:
+        """Extract the city from every location string at once."""
         # Usually format is "City, ST" or "City, State"
-        parts = location.split(",")
-        return parts[0].strip() if parts else ""
+        return locations.astype(str).str.split(",", n=1).str[0].str.strip()
     
     @staticmethod
-    def _extract_date(value) -> Optional[str]:
-        """Extract date from various formats."""
-        if not value:
-            return datetime.now().date().isoformat()
-        
-        if isinstance(value, datetime):
-            return value.date().isoformat()
-        
-        if isinstance(value, str):
-            try:
-                return pd.to_datetime(value).date().isoformat()
-            except:
-                return datetime.now().date().isoformat()
+    def _extract_dates(values: pd.Series) -> pd.Series:
+        """
+        ISO dates from a column of mixed datetimes / date strings.
         
-        return datetime.now().date().isoformat()
+        Parsed in one vectorized call; missing or unparseable values
+        become today's date.
+        """
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+        return parsed.fillna(pd.Timestamp.now().normalize()).dt.strftime("%Y-%m-%d")
     
     def _analyze_velocity(self, df: pd.DataFrame):
         """Analyze job posting velocity by company."""
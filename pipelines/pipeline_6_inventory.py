@@ -100,13 +100,15 @@ class InventoryPipeline:
         logger.info("📦 STARTING PIPELINE 6: INVENTORY TURNOVER")
         logger.info("=" * 50)
         
+        # Company lookups are cached for this run only
+        db.clear_company_cache()
         results = []
         
         for ticker in tickers:
             logger.info(f"\n📊 Processing: {ticker}")
             
             try:
-                turnover = self.get_turnover(ticker)
+                turnover = self.get_turnover(ticker, save=False)
                 
                 if turnover and "error" not in turnover:
                     logger.info(f"   ✅ Turnover ratio: {turnover.get('turnover_ratio', 'N/A')}")
@@ -119,6 +121,10 @@ class InventoryPipeline:
                 logger.error(f"   ❌ Error: {e}")
                 continue
         
+        # One company lookup and one signal upsert for the whole run
+        self._save_turnovers(results)
+        db.clear_company_cache()
+        
         logger.info(f"\n📈 Processed {len(results)}/{len(tickers)} companies")
         return results
     
@@ -161,12 +167,13 @@ class InventoryPipeline:
         
         return None
     
-    def get_turnover(self, ticker: str) -> Dict:
+    def get_turnover(self, ticker: str, save: bool = True) -> Dict:
         """
         Calculate inventory turnover for a company.
         
         Args:
             ticker: Stock ticker symbol
+            save: Save the result to the database (run() saves in bulk)
             
         Returns:
             Dict with turnover data
@@ -226,7 +233,8 @@ class InventoryPipeline:
             }
             
             # Save to database
-            self._save_turnover(result)
+            if save:
+                self._save_turnovers([result])
             
             return result
             
@@ -287,25 +295,31 @@ class InventoryPipeline:
         
         return None
     
-    def _save_turnover(self, result: Dict):
-        """Save turnover data to database."""
+    def _save_turnovers(self, results: List[Dict]):
+        """Save turnover data to database (bulk company lookup and upsert)."""
+        if not results:
+            return
+        
         try:
-            # Find or create company
-            company = db.get_or_create_company(
-                company_name=result["ticker"],  # Use ticker as name for now
-                zip_code="00000",
-                ticker=result["ticker"]
-            )
+            # Find or create companies (ticker used as name for now)
+            companies = db.get_or_create_companies([
+                (result["ticker"], "00000", {"ticker": result["ticker"]})
+                for result in results
+            ])
             
-            if company:
-                db.save_signal_history(
-                    company_id=company["id"],
-                    signals={
-                        "inventory_turnover_ratio": result.get("turnover_ratio"),
-                        "turnover_score": result.get("score"),
-                        "record_date": datetime.now().date().isoformat()
-                    }
-                )
+            record_date = datetime.now().date().isoformat()
+            # Keyed by company so a repeated ticker upserts its row once
+            rows = {
+                company["id"]: {
+                    "company_id": company["id"],
+                    "inventory_turnover_ratio": result.get("turnover_ratio"),
+                    "turnover_score": result.get("score"),
+                    "record_date": record_date
+                }
+                for result, company in zip(results, companies)
+                if company
+            }
+            db.save_signal_history_bulk(list(rows.values()))
                 
         except Exception as e:
             logger.debug(f"Error saving turnover: {e}")
@@ -0,0 +1,66 @@
+"""
+💾 SOCRATA RESPONSE CACHE
+=========================
+Persistent on-disk cache for Socrata query results, keyed by dataset + SoQL.
+
+Permit windows overlap run to run and the most recent days rarely change
+within a few hours; a fresh hit skips the HTTP round trip entirely.
+
+Freshness is checked per read, while entries live for max_age_seconds so
+a failing endpoint can fall back to the last good response
+(stale-on-error).
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+
+from database.ttl_cache import CACHE_DIR, TTLCache
+
+
+DEFAULT_CACHE_PATH = CACHE_DIR / "socrata.sqlite"
+DEFAULT_MAX_AGE_SECONDS = 7 * 86400
+
+
+class SocrataCache(TTLCache):
+    """
+    Key/value cache of Socrata responses with per-read TTL.
+    
+    Usage:
+        cache = SocrataCache()
+        key = SocrataCache.make_key(dataset_id, query)
+        
+        rows = cache.get(key, ttl_seconds=6 * 3600)
+        if rows is None:
+            try:
+                rows = client.get(dataset_id, query=query)
+                cache.set(key, rows)
+            except Exception:
+                rows = cache.get(key, allow_stale=True)
+    """
+    
+    DEFAULT_PATH = DEFAULT_CACHE_PATH
+    LEGACY_TABLE = "socrata_cache"
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS
+    ):
+        super().__init__(path, ttl_seconds=max_age_seconds)
+    
+    def get(
+        self,
+        key: str,
+        ttl_seconds: float = 6 * 3600,
+        allow_stale: bool = False
+    ) -> Optional[Any]:
+        """
+        Return the cached value, or None if missing.
+        
+        Args:
+            key: Cache key from make_key()
+            ttl_seconds: Maximum age of a fresh entry
+            allow_stale: Return the entry even if older than ttl_seconds
+                (up to the cache's max age)
+        """
+        return super().get(key, max_age_seconds=None if allow_stale else ttl_seconds)
@@ -126,7 +126,7 @@ def run_pipelines(skip_glassdoor: bool = False, skip_sec: bool = False):
     try:
         p3 = MacroPipeline()
         results["macro"] = p3.run()
-        results["macro_modifier"] = p3.get_macro_modifier()
+        results["macro_modifier"] = p3.get_macro_modifier(results["macro"])
         logger.info(f"✅ Macro modifier: {results['macro_modifier']}")
     except Exception as e:
         logger.error(f"❌ Pipeline 3 failed: {e}")
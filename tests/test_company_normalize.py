@@ -0,0 +1,30 @@
+"""
+🧪 COMPANY NAME NORMALIZATION TESTS
+===================================
+normalized_name must keep matching the rows already in company_master, so
+stacked legal suffixes are stripped the way the original loop stripped them.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("supabase")
+pytest.importorskip("httpx")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.connection import DatabaseConnection
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("ABC Company LLC", "abc"),
+    ("Smith Co Inc", "smith"),
+    ("Foo Ltd LLC", "foo"),
+    ("Acme Corporation", "acme"),
+    ("O'Reilly Logistics, Inc", "oreilly logistics"),
+    ("Disco", "disco"),
+    ("", ""),
+])
+def test_normalize_company_name(name, expected):
+    assert DatabaseConnection._normalize_company_name(name) == expected
@@ -0,0 +1,50 @@
+"""
+🧪 MACRO TREND TESTS
+====================
+Gaps in a FRED series (NaN) are skipped, as Series.mean() skipped them,
+instead of turning the whole trend into NaN.
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("supabase")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from pipelines.pipeline_3_macro import _trend_numeric
+
+
+def test_nan_in_current_window_is_skipped():
+    values = np.array([100.0, 100.0, 100.0, 110.0, np.nan, 110.0])
+    
+    pct_change, current_avg, previous_avg, code = _trend_numeric(values)
+    
+    assert current_avg == pytest.approx(110.0)
+    assert previous_avg == pytest.approx(100.0)
+    assert pct_change == pytest.approx(0.10)
+    assert code == 1
+
+
+def test_nan_in_previous_window_is_skipped():
+    values = np.array([np.nan, 100.0, 100.0, 90.0, 90.0, 90.0])
+    
+    pct_change, _, previous_avg, code = _trend_numeric(values)
+    
+    assert previous_avg == pytest.approx(100.0)
+    assert pct_change == pytest.approx(-0.10)
+    assert code == -1
+
+
+def test_all_missing_window_means_no_trend():
+    values = np.array([100.0, 100.0, 100.0, np.nan, np.nan, np.nan])
+    
+    pct_change, current_avg, _, code = _trend_numeric(values)
+    
+    assert math.isnan(current_avg)
+    assert pct_change == 0.0
+    assert code == 0
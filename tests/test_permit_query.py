@@ -0,0 +1,93 @@
+"""
+🧪 PERMIT QUERY TESTS
+=====================
+The SoQL sent to each city selects only the columns used downstream,
+including the city's own permit number, so the (source_city, permit_id)
+upsert key stays stable between runs.
+"""
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("httpx")
+pytest.importorskip("supabase")
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import SOCRATA_ENDPOINTS
+from pipelines.pipeline_1_permits import PermitPipeline
+
+
+def _pipeline() -> PermitPipeline:
+    """A pipeline with just the state query building needs."""
+    pipeline = PermitPipeline.__new__(PermitPipeline)
+    pipeline.min_value = 50000
+    return pipeline
+
+
+@pytest.mark.parametrize("city_name", list(SOCRATA_ENDPOINTS))
+def test_query_selects_only_configured_columns(city_name):
+    config = SOCRATA_ENDPOINTS[city_name]
+    query, fallback = _pipeline()._build_query_templates(config)
+    
+    expected = {
+        config.date_field,
+        config.description_field,
+        config.value_field,
+        config.address_field,
+        config.permit_id_field,
+        *config.extra_fields,
+    }
+    if config.contractor_field:
+        expected.add(config.contractor_field)
+    
+    for params in (query, fallback):
+        assert set(params["$select"].split(",")) == expected
+        # Never Socrata's internal row id in place of the permit number
+        assert ":id" not in " ".join(params.values())
+
+
+def test_extra_fields_are_selected():
+    config = replace(SOCRATA_ENDPOINTS["Dallas"], extra_fields=("zip_code",))
+    query, _ = _pipeline()._build_query_templates(config)
+    
+    assert query["$select"].split(",")[-1] == "zip_code"
+
+
+def test_configured_permit_field_becomes_permit_number():
+    config = replace(
+        SOCRATA_ENDPOINTS["Dallas"],
+        permit_id_field="permit_no",
+        contractor_field="contractor"
+    )
+    raw = pd.DataFrame({
+        "permit_no": ["BP-1"],
+        "permit_number": ["ignored"],
+        "contractor": ["Acme Builders"],
+        config.description_field: ["new warehouse"],
+    })
+    
+    df = PermitPipeline._canonicalize_columns(raw, config)
+    
+    assert df["permit_number"].tolist() == ["BP-1"]
+    assert df["contractor_name"].tolist() == ["Acme Builders"]
+    assert df["work_description"].tolist() == ["new warehouse"]
+
+
+def test_contractor_optional():
+    config = replace(SOCRATA_ENDPOINTS["Fort Worth"], contractor_field=None)
+    raw = pd.DataFrame({
+        config.permit_id_field: ["PB24-0001"],
+        config.value_field: ["125000"],
+    })
+    
+    df = PermitPipeline._canonicalize_columns(raw, config)
+    
+    assert df["permit_number"].tolist() == ["PB24-0001"]
+    assert df["reported_cost"].tolist() == ["125000"]
+    assert "contractor_name" not in df.columns
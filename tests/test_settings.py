@@ -0,0 +1,55 @@
+"""
+🧪 SETTINGS ENV TESTS
+=====================
+Fields whose names differ from their documented env vars are read through
+validation aliases (pydantic-settings v2 ignores Field(env=...)).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import settings as settings_module
+from config.settings import DatabaseSettings
+
+
+@pytest.fixture
+def snapshot_env(monkeypatch):
+    """Set env vars and re-capture the shared snapshot the models read."""
+    def _set(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        settings_module._snapshot_environ()
+    
+    yield _set
+    monkeypatch.undo()
+    settings_module._snapshot_environ()
+
+
+def test_db_url_reads_supabase_db_url(snapshot_env):
+    snapshot_env(SUPABASE_DB_URL="postgresql://user:pw@db.example.com:5432/postgres")
+    
+    assert DatabaseSettings().db_url == "postgresql://user:pw@db.example.com:5432/postgres"
+
+
+def test_pool_settings_read_documented_env_vars(snapshot_env):
+    snapshot_env(
+        SUPABASE_MAX_CONNECTIONS="7",
+        SUPABASE_MAX_KEEPALIVE_CONNECTIONS="3",
+        SUPABASE_MAX_WORKERS="4",
+    )
+    
+    database = DatabaseSettings()
+    
+    assert database.max_connections == 7
+    assert database.max_keepalive_connections == 3
+    assert database.max_workers == 4
+
+
+def test_field_names_still_accepted_as_kwargs():
+    assert DatabaseSettings(db_url="postgresql://local", max_workers=2).max_workers == 2
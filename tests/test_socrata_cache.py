@@ -0,0 +1,60 @@
+"""
+🧪 SOCRATA CACHE TESTS
+======================
+Expired responses stay readable for stale-on-error, but anything past the
+cache's max age is pruned instead of piling up in the SQLite file.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Importing the pipelines package pulls in every pipeline's dependencies
+pytest.importorskip("pandas")
+pytest.importorskip("httpx")
+pytest.importorskip("supabase")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from pipelines.socrata_cache import SocrataCache
+
+
+def _age(cache: SocrataCache, key: str, seconds: float):
+    """Backdate an entry (creation and expiry) by ``seconds``."""
+    cache._conn.execute(
+        "UPDATE ttl_cache SET created_at = created_at - ?, expires_at = expires_at - ? "
+        "WHERE key = ?",
+        (seconds, seconds, key)
+    )
+    cache._conn.commit()
+
+
+def test_expired_entry_is_still_served_stale(tmp_path):
+    cache = SocrataCache(tmp_path / "socrata.sqlite", max_age_seconds=86400)
+    cache.set("k", [{"permit_number": "1"}])
+    _age(cache, "k", 7200)
+    
+    assert cache.get("k", ttl_seconds=3600) is None
+    assert cache.get("k", allow_stale=True) == [{"permit_number": "1"}]
+
+
+def test_write_prunes_entries_past_max_age(tmp_path):
+    cache = SocrataCache(tmp_path / "socrata.sqlite", max_age_seconds=86400)
+    cache.set("old", [1])
+    _age(cache, "old", 2 * 86400)
+    
+    cache.set("new", [2])
+    
+    assert cache.get("old", allow_stale=True) is None
+    assert cache.get("new") == [2]
+
+
+def test_open_prunes_entries_past_max_age(tmp_path):
+    path = tmp_path / "socrata.sqlite"
+    cache = SocrataCache(path, max_age_seconds=86400)
+    cache.set("old", [1])
+    _age(cache, "old", 2 * 86400)
+    
+    reopened = SocrataCache(path, max_age_seconds=86400)
+    
+    assert reopened.get("old", allow_stale=True) is None
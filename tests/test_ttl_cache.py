@@ -0,0 +1,48 @@
+"""
+🧪 TTL CACHE TESTS
+==================
+Every on-disk cache (Gemini, Socrata, Glassdoor) shares TTLCache, so
+expired rows are pruned on write and on open instead of piling up.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.ttl_cache import TTLCache
+
+
+def _count(cache: TTLCache) -> int:
+    return cache._conn.execute("SELECT COUNT(*) FROM ttl_cache").fetchone()[0]
+
+
+def test_expired_entry_is_missing(tmp_path):
+    cache = TTLCache(tmp_path / "cache.sqlite")
+    cache.set("k", {"a": 1}, ttl_seconds=-1)
+    
+    assert cache.get("k") is None
+
+
+def test_write_prunes_expired_entries(tmp_path):
+    cache = TTLCache(tmp_path / "cache.sqlite")
+    cache.set("old", 1, ttl_seconds=-1)
+    
+    cache.set("new", 2)
+    
+    assert _count(cache) == 1
+    assert cache.get("new") == 2
+
+
+def test_open_prunes_expired_entries(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    TTLCache(path).set("old", 1, ttl_seconds=-1)
+    
+    assert _count(TTLCache(path)) == 0
+
+
+def test_max_age_on_read(tmp_path):
+    cache = TTLCache(tmp_path / "cache.sqlite")
+    cache.set("k", [1])
+    
+    assert cache.get("k", max_age_seconds=0) is None
+    assert cache.get("k") == [1]